@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+数值计算内核模块
+安装 numba 时使用 JIT 编译的单次遍历实现，否则回退到 NumPy 实现
+"""
+
+import numpy as np
+
+# 可选依赖：numba（JIT 编译数值循环）
+try:
+    from numba import njit
+
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+# 趋势斜率使用的最近数据点个数
+TREND_WINDOW = 10
+
+
+if HAS_NUMBA:
+
+    @njit(cache=True)
+    def hr_summary(hrs):
+        """
+        单次遍历计算心率数组的汇总量
+
+        Args:
+            hrs: 非空整型心率数组
+
+        Returns:
+            (最小值, 最大值, 总和, 平方和, 最近10个点的斜率)，
+            数据点不足10个时斜率为0.0
+        """
+        n = hrs.shape[0]
+        lo = np.int64(hrs[0])
+        hi = lo
+        total = 0
+        total_sq = 0
+        # 最近 TREND_WINDOW 个点的回归量，x 取 0..TREND_WINDOW-1
+        start = n - TREND_WINDOW
+        sum_y = 0
+        sum_xy = 0
+        for i in range(n):
+            v = np.int64(hrs[i])
+            if v < lo:
+                lo = v
+            elif v > hi:
+                hi = v
+            total += v
+            total_sq += v * v
+            if i >= start:
+                sum_y += v
+                sum_xy += (i - start) * v
+
+        slope = 0.0
+        if start >= 0:
+            sum_x = TREND_WINDOW * (TREND_WINDOW - 1) // 2
+            sum_x2 = (TREND_WINDOW - 1) * TREND_WINDOW * (2 * TREND_WINDOW - 1) // 6
+            denominator = TREND_WINDOW * sum_x2 - sum_x * sum_x
+            slope = (TREND_WINDOW * sum_xy - sum_x * sum_y) / denominator
+        return lo, hi, total, total_sq, slope
+
+else:
+
+    def hr_summary(hrs):
+        """计算心率数组的汇总量（NumPy 实现，返回值同 numba 版本）"""
+        hrs64 = hrs.astype(np.int64)
+        slope = 0.0
+        if len(hrs64) >= TREND_WINDOW:
+            y = hrs64[-TREND_WINDOW:]
+            sum_x = TREND_WINDOW * (TREND_WINDOW - 1) // 2
+            sum_x2 = (TREND_WINDOW - 1) * TREND_WINDOW * (2 * TREND_WINDOW - 1) // 6
+            denominator = TREND_WINDOW * sum_x2 - sum_x * sum_x
+            sum_xy = int(np.dot(np.arange(TREND_WINDOW), y))
+            slope = (TREND_WINDOW * sum_xy - sum_x * int(y.sum())) / denominator
+        return (
+            int(hrs64.min()),
+            int(hrs64.max()),
+            int(hrs64.sum()),
+            int(np.dot(hrs64, hrs64)),
+            slope,
+        )
@@ -7,71 +7,110 @@
 """
 
 import os
+import re
 import sys
 
 from dotenv import load_dotenv
 
+# watchdog为可选依赖，不可用时回退到定时轮询
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+
+    HAS_WATCHDOG = True
+except ImportError:
+    from typing import Any
+
+    FileSystemEventHandler: Any = object  # 避免undefined错误
+    Observer: Any = None
+    HAS_WATCHDOG = False
+
+
+def _parse_bool(value):
+    """解析布尔型配置值"""
+    return value.lower() == "true"
+
+
+# 配置项定义：(环境变量名, 默认值, 类型转换函数)
+_SPEC = (
+    ("HYPERATE_URL", "", str),
+    ("CURRENT_SIZE", "96", int),
+    ("CURRENT_COLOR", "#FF2D00", str),
+    ("MAX_COLOR", "#FF6B6B", str),
+    ("MIN_COLOR", "#4ECDC4", str),
+    ("BPM_COLOR", "#FFFFFF", str),
+    ("BG_TRANSPARENT", "true", _parse_bool),
+    ("OPACITY", "0.85", float),
+    ("POS_X", "50", int),
+    ("POS_Y", "30", int),
+    ("BLINK_ENABLE", "true", _parse_bool),
+    ("BLINK_THRESHOLD", "160", int),
+    ("ROW_SPACING", "0", int),  # 行间距，0表示默认
+    # RTSS集成配置
+    ("RTSS_DISPLAY_FORMAT", "BPM {current} ({max}/{min})", str),
+    ("RTSS_UPDATE_INTERVAL", "1", int),  # 更新间隔（秒）
+    ("DISPLAY_MODE", "both", str),  # both, default, rtss
+)
+
+# 从 HYPERATE_URL 中匹配 id 查询参数
+_ID_RE = re.compile(r"[?&]id=([^&#]+)")
+
+# .env 文件路径（预先编码为bytes，直接用于stat系统调用）
+_ENV_PATH = os.fsencode(".env")
+
+# 已解析配置的缓存，以 .env 文件的修改时间为键
+_CACHED = {"mtime": None, "cfg": None}
+
+
+def _get_env_mtime():
+    """获取.env文件的修改时间（纳秒），文件不存在时返回None"""
+    try:
+        return os.stat(_ENV_PATH).st_mtime_ns
+    except OSError:
+        return None
 
-def load_config():
-    """加载环境变量配置"""
-    load_dotenv()
 
-    # 从环境变量读取配置，提供默认值
-    HYPERATE_URL = os.getenv("HYPERATE_URL", "")
-    if not HYPERATE_URL:
+def load_config():
+    """加载环境变量配置（.env 未修改时直接返回缓存副本）"""
+    mtime = _get_env_mtime()
+    if mtime is not None and mtime == _CACHED["mtime"]:
+        return _CACHED["cfg"].copy()
+
+    # 首次加载不覆盖已有的系统环境变量，之后的重新加载以 .env 为准
+    load_dotenv(override=_CACHED["cfg"] is not None)
+
+    # 一次性解析所有配置项，提供默认值
+    env = os.environ
+    config = {key: cast(env.get(key, default)) for key, default, cast in _SPEC}
+    if not config["HYPERATE_URL"]:
         print("错误: 未设置 HYPERATE_URL 环境变量")
         print("请复制 .env.example 为 .env 并填写你的配置")
         sys.exit(1)
 
-    # 显示设置（从环境变量读取，提供默认值）
-    current_size = int(os.getenv("CURRENT_SIZE", "96"))
-    unit_size = int(current_size * 0.70)  # Max/Min字体大小缩小到70%
-    current_font_size = unit_size * 2  # 当前心率字体大小是Max/Min的两倍
-
-    config = {
-        "HYPERATE_URL": HYPERATE_URL,
-        "CURRENT_SIZE": current_size,  # 保留原始配置，但实际使用current_font_size
-        "UNIT_SIZE": unit_size,  # Max/Min字体大小
-        "CURRENT_FONT_SIZE": current_font_size,  # 当前心率字体大小（UNIT_SIZE的两倍）
-        "CURRENT_COLOR": os.getenv("CURRENT_COLOR", "#FF2D00"),
-        "MAX_COLOR": os.getenv("MAX_COLOR", "#FF6B6B"),
-        "MIN_COLOR": os.getenv("MIN_COLOR", "#4ECDC4"),
-        "BPM_COLOR": os.getenv("BPM_COLOR", "#FFFFFF"),
-        "BG_TRANSPARENT": os.getenv("BG_TRANSPARENT", "true").lower() == "true",
-        "OPACITY": float(os.getenv("OPACITY", "0.85")),
-        "POS_X": int(os.getenv("POS_X", "50")),
-        "POS_Y": int(os.getenv("POS_Y", "30")),
-        "BLINK_ENABLE": os.getenv("BLINK_ENABLE", "true").lower() == "true",
-        "BLINK_THRESHOLD": int(os.getenv("BLINK_THRESHOLD", "160")),
-        "ROW_SPACING": int(os.getenv("ROW_SPACING", "0")),  # 行间距，0表示默认
-        # RTSS集成配置
-        "RTSS_DISPLAY_FORMAT": os.getenv(
-            "RTSS_DISPLAY_FORMAT", "BPM {current} ({max}/{min})"
-        ),
-        "RTSS_UPDATE_INTERVAL": int(
-            os.getenv("RTSS_UPDATE_INTERVAL", "1")
-        ),  # 更新间隔（秒）
-        "DISPLAY_MODE": os.getenv("DISPLAY_MODE", "both"),  # both, default, rtss
-    }
-
-    return config
+    # 派生的字体大小（CURRENT_SIZE 保留原始配置，但实际使用 CURRENT_FONT_SIZE）
+    unit_size = int(config["CURRENT_SIZE"] * 0.70)  # Max/Min字体大小缩小到70%
+    config["UNIT_SIZE"] = unit_size
+    config["CURRENT_FONT_SIZE"] = unit_size * 2  # 当前心率字体大小是Max/Min的两倍
+    config["CHANNEL_ID"] = extract_channel_id(config["HYPERATE_URL"])
+
+    _CACHED["mtime"] = mtime
+    _CACHED["cfg"] = config
+    return config.copy()
+
+
+def _cache_clear():
+    """清空配置缓存，下次调用 load_config 时重新解析"""
+    _CACHED["mtime"] = None
+    _CACHED["cfg"] = None
+
+
+load_config.cache_clear = _cache_clear
 
 
 def extract_channel_id(hyperate_url):
     """从URL中提取channelId"""
-    try:
-        # 从HYPERATE_URL中提取id参数
-        if "id=" in hyperate_url:
-            channel_id = hyperate_url.split("id=")[1]
-            # 移除可能的后缀
-            if "&" in channel_id:
-                channel_id = channel_id.split("&")[0]
-            if "#" in channel_id:
-                channel_id = channel_id.split("#")[0]
-            return channel_id
-    except Exception as e:
-        print(f"提取channelId失败: {e}")
-    return "internal-testing"  # 默认值
+    match = _ID_RE.search(hyperate_url)
+    return match.group(1) if match else "internal-testing"  # 默认值
 
 
 class ConfigWatcher:
@@ -83,22 +122,36 @@ class ConfigWatcher:
 
     def _update_env_file_mtime(self):
         """更新.env文件的修改时间记录"""
-        try:
-            if os.path.exists(".env"):
-                self.env_file_mtime = os.path.getmtime(".env")
-        except Exception:
-            pass
+        self.env_file_mtime = _get_env_mtime() or 0
 
     def check_and_reload_env(self):
         """检查.env文件是否被修改，如果是则重新加载并更新显示"""
-        try:
-            if os.path.exists(".env"):
-                current_mtime = os.path.getmtime(".env")
-                if current_mtime > self.env_file_mtime:
-                    print("检测到.env文件已修改，重新加载环境变量...")
-                    load_dotenv(override=True)
-                    self.env_file_mtime = current_mtime
-                    return True
-        except Exception as e:
-            print(f"检查.env文件时出错: {e}")
+        # 单次stat获取纳秒级修改时间，文件不存在时视为未修改
+        current_mtime = _get_env_mtime()
+        if current_mtime is not None and current_mtime > self.env_file_mtime:
+            print("检测到.env文件已修改，重新加载环境变量...")
+            # 仅使缓存失效，由下一次 load_config 重新读取 .env
+            _CACHED["mtime"] = None
+            self.env_file_mtime = current_mtime
+            return True
         return False
+
+
+class EnvFileEventHandler(FileSystemEventHandler):
+    """watchdog事件处理器，仅在.env文件变化时触发回调"""
+
+    def __init__(self, callback):
+        """
+        初始化事件处理器
+
+        Args:
+            callback: .env文件变化时调用的无参函数
+        """
+        super().__init__()
+        self.callback = callback
+
+    def on_any_event(self, event):
+        """过滤出.env文件的事件（包括编辑器以重命名方式保存的情况）"""
+        paths = (event.src_path, getattr(event, "dest_path", ""))
+        if any(os.path.basename(os.fsdecode(p)) == ".env" for p in paths if p):
+            self.callback()
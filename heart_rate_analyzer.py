@@ -7,21 +7,61 @@
 """
 
 import argparse
+import importlib.util
+import io
 import sys
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 
-# 检查matplotlib是否可用
-try:
-    import matplotlib.pyplot as plt
+# matplotlib为可选依赖，仅检查是否安装，首次绘图时才真正导入
+HAS_MATPLOTLIB = importlib.util.find_spec("matplotlib") is not None
+_plt = None
 
-    HAS_MATPLOTLIB = True
-except ImportError:
-    from typing import Any
 
-    plt: Any = None  # 避免undefined错误
-    HAS_MATPLOTLIB = False
+def _get_plt():
+    """
+    延迟导入matplotlib.pyplot并缓存，不可用时返回None
+    """
+    global _plt, HAS_MATPLOTLIB
+    if _plt is None and HAS_MATPLOTLIB:
+        try:
+            import matplotlib
+
+            # 仅输出图片文件，使用非交互式Agg后端，跳过GUI后端探测
+            matplotlib.use("Agg")
+            import matplotlib.pyplot as plt
+
+            # 合并重叠的折线顶点，减少密集数据的渲染开销
+            plt.rcParams["path.simplify"] = True
+            plt.rcParams["path.simplify_threshold"] = 1.0
+            _plt = plt
+        except ImportError:
+            HAS_MATPLOTLIB = False
+    return _plt
+
+
+# 心率区间边界及名称（<50, 50-59, 60-99, 100-139, >=140）
+HR_ZONE_EDGES = np.array([50, 60, 100, 140])
+HR_ZONE_KEYS = ("very_low", "low", "normal", "elevated", "high")
+
+# 趋势图中每条折线绘制的最大数据点数
+TREND_PLOT_MAX_POINTS = 2000
+
+# 图表输出分辨率
+PLOT_DPI = 150
+
+# 分块读取日志文件时每块的行数
+LOG_CHUNK_SIZE = 100_000
+
+
+def count_heart_rate_zones(hr):
+    """
+    单次遍历统计各心率区间的数据点数量，返回长度为5的计数数组
+    """
+    idx = np.searchsorted(HR_ZONE_EDGES, hr, side="right")
+    return np.bincount(idx, minlength=len(HR_ZONE_KEYS))
 
 
 def load_heart_rate_data_from_log(log_file):
@@ -36,49 +76,40 @@ def load_heart_rate_data_from_log(log_file):
         has_header = "timestamp" in first_line.lower()
 
         if has_header:
-            # 有头部，使用pandas直接读取
+            # 有头部，使用pandas直接读取；数值列逐值转换，无法解析的值置为NaN后移除
             df = pd.read_csv(log_file, encoding="utf-8")
+            if "timestamp" in df.columns and "heart_rate" in df.columns:
+                df["timestamp"] = pd.to_numeric(df["timestamp"], errors="coerce")
+                df["heart_rate"] = pd.to_numeric(df["heart_rate"], errors="coerce")
             print(f"检测到CSV头部，成功加载日志文件: {log_file}")
         else:
-            # 无头部，手动解析每一行
-            data = []
-            with open(log_file, "r", encoding="utf-8") as f:
-                for line_num, line in enumerate(f, 1):
-                    line = line.strip()
-                    if not line:
-                        continue
-
-                    # 按逗号分割并期望3个或4个字段
-                    parts = [part.strip() for part in line.split(",")]
-                    if len(parts) >= 3:
-                        try:
-                            timestamp = float(parts[0])
-                            heart_rate = int(parts[1])
-                            datetime_iso = parts[2]
-
-                            data_point = {
-                                "timestamp": timestamp,
-                                "heart_rate": heart_rate,
-                                "datetime": datetime_iso,
-                            }
-
-                            # 如果有第4个字段（readable_time）
-                            if len(parts) >= 4:
-                                data_point["readable_time"] = ",".join(parts[3:])
-
-                            data.append(data_point)
-                        except ValueError as e:
-                            print(f"警告: 第{line_num}行数据格式错误，跳过: {e}")
-                            continue
-                    else:
-                        print(f"警告: 第{line_num}行字段数量不足，跳过: {line}")
-                        continue
-
-            if not data:
+            # 无头部，交给pandas的C解析器按固定列名读取，字段过多的行直接跳过
+            df = pd.read_csv(
+                log_file,
+                header=None,
+                names=["timestamp", "heart_rate", "datetime", "readable_time"],
+                encoding="utf-8",
+                skipinitialspace=True,
+                on_bad_lines="skip",
+                engine="c",
+            )
+
+            # 跳过字段数量不足或时间戳/心率无法解析的行
+            df["timestamp"] = pd.to_numeric(df["timestamp"], errors="coerce")
+            df["heart_rate"] = pd.to_numeric(df["heart_rate"], errors="coerce")
+            invalid = df[["timestamp", "heart_rate", "datetime"]].isna().any(axis=1)
+            if invalid.any():
+                print(f"警告: {int(invalid.sum())} 行数据格式错误或字段数量不足，跳过")
+                df = df[~invalid]
+
+            # 所有行都没有第4个字段（readable_time）时移除该列
+            if df["readable_time"].isna().all():
+                df = df.drop(columns="readable_time")
+
+            if df.empty:
                 print("日志文件为空或无有效数据")
                 sys.exit(1)
 
-            df = pd.DataFrame(data)
             print(f"无头部日志文件解析完成: {log_file}")
 
         print(f"数据点总数: {len(df)}")
@@ -88,14 +119,15 @@ def load_heart_rate_data_from_log(log_file):
             print("数据格式错误，缺少timestamp或heart_rate列")
             sys.exit(1)
 
-        # 转换数据类型
-        df["timestamp"] = pd.to_numeric(df["timestamp"], errors="coerce")
-        df["timestamp"] = pd.to_datetime(df["timestamp"], unit="s")
-        df["heart_rate"] = pd.to_numeric(df["heart_rate"], errors="coerce").astype(int)
+        # 转换时间戳（数值列已在读取后转换）
+        df["timestamp"] = pd.to_datetime(
+            df["timestamp"].to_numpy(), unit="s", errors="coerce", cache=False
+        )
 
-        # 删除无效数据
+        # 删除时间戳或心率无效的数据
         original_count = len(df)
-        df = df.dropna()
+        df.dropna(subset=["timestamp", "heart_rate"], inplace=True)
+        df["heart_rate"] = df["heart_rate"].astype(int)
         cleaned_count = len(df)
 
         if cleaned_count < original_count:
@@ -113,6 +145,35 @@ def load_heart_rate_data_from_log(log_file):
         sys.exit(1)
 
 
+def _read_log_chunks(log_file, chunksize=LOG_CHUNK_SIZE):
+    """
+    分块读取日志文件中的timestamp和heart_rate两列，逐块转换为紧凑的数值类型
+    """
+    with open(log_file, "r", encoding="utf-8") as f:
+        has_header = "timestamp" in f.readline().lower()
+
+    if has_header:
+        columns = {"usecols": ["timestamp", "heart_rate"]}
+    else:
+        columns = {
+            "header": None,
+            "usecols": [0, 1],
+            "names": ["timestamp", "heart_rate"],
+        }
+
+    chunks = []
+    for chunk in pd.read_csv(
+        log_file,
+        encoding="utf-8",
+        chunksize=chunksize,
+        on_bad_lines="skip",
+        **columns,
+    ):
+        chunk = chunk.apply(pd.to_numeric, errors="coerce").dropna()
+        chunks.append(chunk.astype({"timestamp": "float64", "heart_rate": "int32"}))
+    return chunks
+
+
 def load_heart_rate_data_from_dir(data_dir, days=7):
     """
     从数据目录加载最近N天的所有心率数据
@@ -135,15 +196,17 @@ def load_heart_rate_data_from_dir(data_dir, days=7):
 
             if log_file.exists():
                 print("Loading: " + str(log_file.name))
-                daily_data = load_heart_rate_data_from_log(str(log_file))
-                all_data.append(daily_data)
+                all_data.extend(_read_log_chunks(str(log_file)))
 
         if not all_data:
             print("No data files found in directory: " + str(data_dir))
             sys.exit(1)
 
-        # 合并所有数据
+        # 合并所有数据，时间戳在合并后统一转换一次
         combined_df = pd.concat(all_data, ignore_index=True)
+        combined_df["timestamp"] = pd.to_datetime(
+            combined_df["timestamp"], unit="s", cache=False
+        )
 
         # 按时间排序
         combined_df = combined_df.sort_values("timestamp").reset_index(drop=True)
@@ -152,9 +215,9 @@ def load_heart_rate_data_from_dir(data_dir, days=7):
         print("Total data points: " + str(len(combined_df)))
         print(
             "Date range: "
-            + str(combined_df["timestamp"].min())
+            + str(combined_df["timestamp"].iloc[0])
             + " to "
-            + str(combined_df["timestamp"].max())
+            + str(combined_df["timestamp"].iloc[-1])
         )
 
         return combined_df
@@ -169,7 +232,7 @@ def load_heart_rate_data(csv_file):
     加载心率数据CSV文件
     """
     try:
-        df = pd.read_csv(csv_file)
+        df = pd.read_csv(csv_file, dtype={"timestamp": "float64"})
         print("Successfully loaded data file: " + str(csv_file))
         print("Data points: " + str(len(df)))
 
@@ -179,8 +242,7 @@ def load_heart_rate_data(csv_file):
             sys.exit(1)
 
         # 转换数据类型
-        df["timestamp"] = pd.to_numeric(df["timestamp"])
-        df["timestamp"] = pd.to_datetime(df["timestamp"], unit="s")
+        df["timestamp"] = pd.to_datetime(df["timestamp"], unit="s", cache=False)
         df["heart_rate"] = df["heart_rate"].astype(int)
 
         # 排序
@@ -188,9 +250,9 @@ def load_heart_rate_data(csv_file):
 
         print(
             "Time range: "
-            + str(df["timestamp"].min())
+            + str(df["timestamp"].iloc[0])
             + " - "
-            + str(df["timestamp"].max())
+            + str(df["timestamp"].iloc[-1])
         )
 
         return df
@@ -209,52 +271,48 @@ def calculate_comprehensive_stats(df):
     """
     stats = {}
 
+    # 取出连续的numpy数组，后续统计直接使用numpy归约
+    hr = np.ascontiguousarray(df["heart_rate"].to_numpy())
+    ts = df["timestamp"].to_numpy()
+    mean_hr = hr.mean()
+    std_hr = hr.std(ddof=1) if hr.size > 1 else np.nan  # 与pandas一致的样本标准差
+
     # 基本统计
     stats["total_points"] = len(df)
-    stats["min_hr"] = int(df["heart_rate"].min())
-    stats["max_hr"] = int(df["heart_rate"].max())
-    stats["mean_hr"] = round(df["heart_rate"].mean(), 1)
-    stats["median_hr"] = int(df["heart_rate"].median())
-    stats["std_hr"] = round(df["heart_rate"].std(), 2)
+    stats["min_hr"] = int(hr.min())
+    stats["max_hr"] = int(hr.max())
+    stats["mean_hr"] = round(mean_hr, 1)
+    stats["median_hr"] = int(np.median(hr))
+    stats["std_hr"] = round(std_hr, 2)
 
     # 时间统计
-    time_span = df["timestamp"].max() - df["timestamp"].min()
-    stats["duration_seconds"] = time_span.total_seconds()
-    stats["duration_minutes"] = round(time_span.total_seconds() / 60, 1)
-    stats["duration_hours"] = round(time_span.total_seconds() / 3600, 1)
+    start_time, end_time = ts.min(), ts.max()
+    stats["start_time"] = pd.Timestamp(start_time)
+    stats["end_time"] = pd.Timestamp(end_time)
+    duration_seconds = float((end_time - start_time) / np.timedelta64(1, "s"))
+    stats["duration_seconds"] = duration_seconds
+    stats["duration_minutes"] = round(duration_seconds / 60, 1)
+    stats["duration_hours"] = round(duration_seconds / 3600, 1)
 
     # 心率区间统计
-    hr_ranges = {
-        "very_low": len(df[df["heart_rate"] < 50]),
-        "low": len(df[(df["heart_rate"] >= 50) & (df["heart_rate"] < 60)]),
-        "normal": len(df[(df["heart_rate"] >= 60) & (df["heart_rate"] < 100)]),
-        "elevated": len(df[(df["heart_rate"] >= 100) & (df["heart_rate"] < 140)]),
-        "high": len(df[df["heart_rate"] >= 140]),
-    }
-    stats["ranges"] = hr_ranges
+    counts = count_heart_rate_zones(hr)
+    stats["ranges"] = dict(zip(HR_ZONE_KEYS, counts.tolist()))
 
     # 心率变异性指标
     if len(df) > 1:
-        stats["cv"] = round(
-            (df["heart_rate"].std() / df["heart_rate"].mean()) * 100, 1
-        )  # 变异系数
+        stats["cv"] = round((std_hr / mean_hr) * 100, 1)  # 变异系数
 
-        # 需要numpy计算RMSSD
-        try:
-            import numpy as np
-
-            stats["rmssd"] = round(
-                np.sqrt(np.mean(np.diff(df["heart_rate"]) ** 2)), 2
-            )  # RMSSD
-        except ImportError:
-            stats["rmssd"] = 0.0  # 如果没有numpy，使用默认值
+        # RMSSD：相邻差值的均方根，用点积求平方和避免中间数组
+        d = np.diff(hr).astype(np.float64)
+        stats["rmssd"] = round(float(np.sqrt(np.dot(d, d) / d.size)), 2)
     else:
         stats["cv"] = 0.0
         stats["rmssd"] = 0.0
 
     # 分位数
-    stats["q25"] = int(df["heart_rate"].quantile(0.25))
-    stats["q75"] = int(df["heart_rate"].quantile(0.75))
+    q25, q75 = np.quantile(hr, [0.25, 0.75])
+    stats["q25"] = int(q25)
+    stats["q75"] = int(q75)
     stats["iqr"] = round(stats["q75"] - stats["q25"], 1)
 
     # 异常值界限
@@ -265,30 +323,47 @@ def calculate_comprehensive_stats(df):
     return stats
 
 
-def plot_heart_rate_trend(df, output_dir="."):
+def _prepare_figure(fig, figsize):
     """
-    绘制心率趋势图
+    准备绘图用的Figure：传入已有Figure时清空复用，否则新建
     """
-    if not HAS_MATPLOTLIB:
-        return
+    if fig is None:
+        return _get_plt().figure(figsize=figsize, layout="constrained")
+    fig.clear()
+    fig.set_size_inches(figsize)
+    fig.set_layout_engine("constrained")
+    return fig
+
 
-    assert plt is not None  # tell type checker plt is available
+def plot_heart_rate_trend(df, output_dir=".", fig=None):
+    """
+    绘制心率趋势图，可传入fig以复用已有Figure
+    """
+    plt = _get_plt()
+    if plt is None:
+        return
 
-    plt.figure(figsize=(15, 10))
+    # 折线图按步长抽样，顶点数不超过图表水平分辨率
+    step = max(1, len(df) // TREND_PLOT_MAX_POINTS)
+    hr = df["heart_rate"].to_numpy()
+    ts = df["timestamp"].to_numpy()[::step]
+    moving_avg = df["heart_rate"].rolling(window=10, min_periods=1).mean().to_numpy()
 
     # 创建子图
-    fig, (ax1, ax2, ax3) = plt.subplots(3, 1, figsize=(15, 10))
+    owns_fig = fig is None
+    fig = _prepare_figure(fig, (15, 10))
+    ax1, ax2, ax3 = fig.subplots(3, 1)
 
     # 原始心率数据
-    ax1.plot(df["timestamp"], df["heart_rate"], "b-", alpha=0.7, linewidth=1)
+    ax1.plot(ts, hr[::step], "b-", alpha=0.7, linewidth=1)
     ax1.set_title("Heart Rate Trend")
     ax1.set_ylabel("Heart Rate (BPM)")
     ax1.grid(True, alpha=0.3)
 
     # 心率直方图
-    ax3.hist(df["heart_rate"], bins=30, edgecolor="black", alpha=0.7)
-    mean_hr = df["heart_rate"].mean()
-    median_hr = df["heart_rate"].median()
+    ax3.hist(hr, bins=30, edgecolor="black", alpha=0.7)
+    mean_hr = hr.mean()
+    median_hr = np.median(hr)
     ax3.axvline(
         mean_hr,
         color="red",
@@ -311,8 +386,8 @@ def plot_heart_rate_trend(df, output_dir="."):
 
     # 简单趋势线
     ax2.plot(
-        df["timestamp"],
-        df["heart_rate"].rolling(window=10, min_periods=1).mean(),
+        ts,
+        moving_avg[::step],
         "r-",
         linewidth=2,
         label="10-point moving average",
@@ -322,49 +397,34 @@ def plot_heart_rate_trend(df, output_dir="."):
     ax2.legend()
     ax2.grid(True, alpha=0.3)
 
-    plt.tight_layout()
     output_path = str(output_dir) + "/heart_rate_trend.png"
-    plt.savefig(output_path, dpi=300, bbox_inches="tight")
-    plt.close()
+    fig.savefig(output_path, dpi=PLOT_DPI)
+    if owns_fig:
+        plt.close(fig)
 
     print("Chart saved to: " + output_path)
 
 
-def plot_heart_rate_zones(df, output_dir="."):
+def plot_heart_rate_zones(df, output_dir=".", fig=None, ranges=None):
     """
-    绘制心率区间分析图
+    绘制心率区间分析图，可传入fig以复用已有Figure，
+    传入ranges（calculate_comprehensive_stats的区间统计）时不再重新计算
     """
-    if not HAS_MATPLOTLIB:
+    plt = _get_plt()
+    if plt is None:
         return
 
-    assert plt is not None  # tell type checker plt is available
-
     # 计算心率区间
-    zones = [
-        ("Very Low", "< 50 BPM", len(df[df["heart_rate"] < 50])),
-        (
-            "Low",
-            "50-59 BPM",
-            len(df[(df["heart_rate"] >= 50) & (df["heart_rate"] < 60)]),
-        ),
-        (
-            "Normal",
-            "60-99 BPM",
-            len(df[(df["heart_rate"] >= 60) & (df["heart_rate"] < 100)]),
-        ),
-        (
-            "Elevated",
-            "100-139 BPM",
-            len(df[(df["heart_rate"] >= 100) & (df["heart_rate"] < 140)]),
-        ),
-        ("High", ">= 140 BPM", len(df[df["heart_rate"] >= 140])),
-    ]
-
-    zone_names = [z[0] for z in zones]
-    zone_counts = [z[2] for z in zones]
-    zone_ranges = [z[1] for z in zones]
+    zone_names = ["Very Low", "Low", "Normal", "Elevated", "High"]
+    zone_ranges = ["< 50 BPM", "50-59 BPM", "60-99 BPM", "100-139 BPM", ">= 140 BPM"]
+    if ranges is not None:
+        zone_counts = [ranges[key] for key in HR_ZONE_KEYS]
+    else:
+        zone_counts = count_heart_rate_zones(df["heart_rate"].to_numpy()).tolist()
 
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 6))
+    owns_fig = fig is None
+    fig = _prepare_figure(fig, (12, 6))
+    ax1, ax2 = fig.subplots(1, 2)
 
     # 饼图
     colors = ["lightblue", "lightgreen", "green", "orange", "red"]
@@ -387,10 +447,10 @@ def plot_heart_rate_zones(df, output_dir="."):
     for i, (bar, count) in enumerate(zip(bars, zone_counts)):
         ax2.text(count + max(zone_counts) * 0.01, i, str(count), va="center")
 
-    plt.tight_layout()
     output_path = str(output_dir) + "/heart_rate_zones.png"
-    plt.savefig(output_path, dpi=300, bbox_inches="tight")
-    plt.close()
+    fig.savefig(output_path, dpi=PLOT_DPI)
+    if owns_fig:
+        plt.close(fig)
 
     print("Zone analysis saved to: " + output_path)
 
@@ -401,67 +461,50 @@ def generate_analysis_report(df, stats, output_dir="."):
     """
     output_path = str(output_dir) + "/analysis_report.txt"
 
-    with open(output_path, "w", encoding="utf-8") as f:
-        f.write("=" * 60 + "\n")
-        f.write("心率数据分析报告\n")
-        f.write("=" * 60 + "\n\n")
-
-        f.write("数据概览:\n")
-        f.write("数据点总数: {}\n".format(stats["total_points"]))
-        f.write(
-            "持续时间: {:.1f} 分钟 ({:.1f} 小时)\n".format(
-                stats["duration_minutes"], stats["duration_hours"]
-            )
-        )
-        f.write("心率范围: {} - {} BPM\n\n".format(stats["min_hr"], stats["max_hr"]))
-
-        f.write("统计指标:\n")
-        f.write("平均心率: {:.1f} BPM\n".format(stats["mean_hr"]))
-        f.write("中位心率: {} BPM\n".format(stats["median_hr"]))
-        f.write("标准差: {:.2f} BPM\n".format(stats["std_hr"]))
-        f.write("变异系数: {:.1f}%\n".format(stats["cv"]))
-        f.write("RMSSD: {:.2f}\n\n".format(stats["rmssd"]))
-
+    ranges = stats["ranges"]
+    total = stats["total_points"]
+    start_time = stats["start_time"].strftime("%Y-%m-%d %H:%M:%S")
+    end_time = stats["end_time"].strftime("%Y-%m-%d %H:%M:%S")
+
+    # 先在内存中拼接完整报告，最后一次性写入文件
+    buf = [
+        "=" * 60 + "\n",
+        "心率数据分析报告\n",
+        "=" * 60 + "\n\n",
+        "数据概览:\n",
+        f"数据点总数: {total}\n",
+        f"持续时间: {stats['duration_minutes']:.1f} 分钟 "
+        f"({stats['duration_hours']:.1f} 小时)\n",
+        f"心率范围: {stats['min_hr']} - {stats['max_hr']} BPM\n\n",
+        "统计指标:\n",
+        f"平均心率: {stats['mean_hr']:.1f} BPM\n",
+        f"中位心率: {stats['median_hr']} BPM\n",
+        f"标准差: {stats['std_hr']:.2f} BPM\n",
+        f"变异系数: {stats['cv']:.1f}%\n",
+        f"RMSSD: {stats['rmssd']:.2f}\n\n",
         # 心率区间统计
-        ranges = stats["ranges"]
-        total = stats["total_points"]
-        f.write("心率区间分布:\n")
-        f.write(
-            "极低心率(<50 BPM): {} 次 ({:.1f}%)\n".format(
-                ranges["very_low"], ranges["very_low"] / total * 100
-            )
-        )
-        f.write(
-            "偏低心率(50-59 BPM): {} 次 ({:.1f}%)\n".format(
-                ranges["low"], ranges["low"] / total * 100
-            )
-        )
-        f.write(
-            "正常心率(60-99 BPM): {} 次 ({:.1f}%)\n".format(
-                ranges["normal"], ranges["normal"] / total * 100
-            )
-        )
-        f.write(
-            "偏高心率(100-139 BPM): {} 次 ({:.1f}%)\n".format(
-                ranges["elevated"], ranges["elevated"] / total * 100
-            )
-        )
-        f.write(
-            "过高心率(≥140 BPM): {} 次 ({:.1f}%)\n\n".format(
-                ranges["high"], ranges["high"] / total * 100
-            )
-        )
-
+        "心率区间分布:\n",
+        f"极低心率(<50 BPM): {ranges['very_low']} 次 "
+        f"({ranges['very_low'] / total * 100:.1f}%)\n",
+        f"偏低心率(50-59 BPM): {ranges['low']} 次 "
+        f"({ranges['low'] / total * 100:.1f}%)\n",
+        f"正常心率(60-99 BPM): {ranges['normal']} 次 "
+        f"({ranges['normal'] / total * 100:.1f}%)\n",
+        f"偏高心率(100-139 BPM): {ranges['elevated']} 次 "
+        f"({ranges['elevated'] / total * 100:.1f}%)\n",
+        f"过高心率(≥140 BPM): {ranges['high']} 次 "
+        f"({ranges['high'] / total * 100:.1f}%)\n\n",
         # 时间范围
-        f.write("时间范围:\n")
-        f.write(
-            "开始时间: {}\n".format(df["timestamp"].min().strftime("%Y-%m-%d %H:%M:%S"))
-        )
-        f.write(
-            "结束时间: {}\n".format(df["timestamp"].max().strftime("%Y-%m-%d %H:%M:%S"))
-        )
+        "时间范围:\n",
+        f"开始时间: {start_time}\n",
+        f"结束时间: {end_time}\n",
+        "\n" + "=" * 60 + "\n",
+    ]
 
-        f.write("\n" + "=" * 60 + "\n")
+    with open(
+        output_path, "w", encoding="utf-8", buffering=io.DEFAULT_BUFFER_SIZE * 4
+    ) as f:
+        f.write("".join(buf))
 
     print("分析报告保存至: " + output_path)
 
@@ -525,9 +568,13 @@ def main():
 
         # 生成图表
         if not args.no_plots:
-            if HAS_MATPLOTLIB:
-                plot_heart_rate_trend(df, str(output_dir))
-                plot_heart_rate_zones(df, str(output_dir))
+            plt = _get_plt()
+            if plt is not None:
+                # 两张图表复用同一个Figure
+                fig = plt.figure()
+                plot_heart_rate_trend(df, str(output_dir), fig)
+                plot_heart_rate_zones(df, str(output_dir), fig, stats["ranges"])
+                plt.close(fig)
             else:
                 print("WARNING: matplotlib not available, skipping chart generation")
 
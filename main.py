@@ -6,12 +6,28 @@ Hyperate 三值置顶悬浮窗（当前 / 最高 / 最低心率）
 Python 3.14 + uv + requests
 """
 
-from config import ConfigWatcher, load_config
+import functools
+import os
+import sys
+import threading
+import time
+
+from config import (
+    HAS_WATCHDOG,
+    ConfigWatcher,
+    EnvFileEventHandler,
+    Observer,
+    load_config,
+)
 from rtss_integration import RTSSIntegration
 from stats_analyzer import HeartRateStats
 from ui import HeartRateUI
 from websocket_client import WebSocketClient
 
+# 需要显示默认UI / RTSS OSD 的显示模式
+_UI_MODES = frozenset({"both", "default"})
+_RTSS_MODES = frozenset({"both", "rtss"})
+
 
 class HyperateTripleOverlay:
     def __init__(self):
@@ -23,6 +39,7 @@ class HyperateTripleOverlay:
         """
         # 加载配置
         self.config = load_config()
+        self._display_mode = self.config.get("DISPLAY_MODE", "both")
 
         # 初始化心率统计分析器
         self.stats_analyzer = HeartRateStats()
@@ -33,6 +50,9 @@ class HyperateTripleOverlay:
         # 初始化RTSS集成
         self.rtss = RTSSIntegration(self.config)
 
+        # 根据显示模式构建心率处理函数列表
+        self._build_handlers()
+
         # 初始化配置监视器
         self.config_watcher = ConfigWatcher()
 
@@ -51,104 +71,129 @@ class HyperateTripleOverlay:
         根据显示模式更新UI和/或RTSS显示，并记录统计数据
         """
         try:
-            hr_int = int(heart_rate)
-            # 记录心率数据到统计分析器
-            self.stats_analyzer.add_heart_rate(hr_int)
+            # 记录统计数据（统计分析器内部批量写入日志文件）
+            self.stats_analyzer.add_heart_rate(int(heart_rate))
         except ValueError:
             pass  # 忽略非数字值
 
-        # 获取显示模式
-        display_mode = self.config.get("DISPLAY_MODE", "both")
+        # 按显示模式依次调用UI/RTSS处理函数
+        for handler in self._handlers:
+            handler(heart_rate)
+
+    def _build_handlers(self):
+        """根据当前显示模式预先选定心率处理函数，避免每条消息重复判断"""
+        display_mode = self._display_mode
+        handlers = []
 
-        # 更新UI显示（如果显示模式不是仅RTSS）
-        if display_mode in ["both", "default"]:
-            self.ui.update_heart_rate(heart_rate)
+        if display_mode in _UI_MODES:
+            handlers.append(self.ui.update_heart_rate)
         else:
             # 仅RTSS模式，仍然需要更新UI内部状态但不显示
-            self.ui.update_heart_rate(heart_rate, update_display=False)
+            handlers.append(
+                functools.partial(self.ui.update_heart_rate, update_display=False)
+            )
 
-        # 更新RTSS显示（如果显示模式不是仅默认UI）
-        if display_mode in ["both", "rtss"] and self.rtss.is_enabled():
-            self.rtss.update_heart_rate(self.ui.current, self.ui.max_hr, self.ui.min_hr)
+        if display_mode in _RTSS_MODES and self.rtss.is_enabled():
+            handlers.append(self._update_rtss)
 
-    def start_env_watch_thread(self):
-        """启动环境变量监视线程"""
-        import threading
+        self._handlers = handlers
 
-        def env_watch_loop():
-            while True:
-                try:
-                    if self.config_watcher.check_and_reload_env():
-                        print("环境变量已重新加载")
-                        # 重新加载配置
-                        from config import load_config
-
-                        new_config = load_config()
-                        old_display_mode = self.config.get("DISPLAY_MODE", "both")
-                        self.config = new_config
-                        new_display_mode = new_config.get("DISPLAY_MODE", "both")
-
-                        # 检查显示模式是否改变
-                        if old_display_mode != new_display_mode:
-                            print(
-                                f"显示模式已从 {old_display_mode} 更改为 {new_display_mode}"
-                            )
-
-                            # 根据新模式显示或隐藏UI窗口
-                            if new_display_mode in ["both", "default"]:
-                                self.ui.show_window()
-                            elif new_display_mode == "rtss":
-                                self.ui.hide_window()
-
-                        # 更新 UI 配置
-                        self.ui.update_config(new_config)
-                        # 更新RTSS配置
-                        self.rtss.config = new_config
-                except Exception as e:
-                    print(f"环境变量监视线程出错: {e}")
-                import time
-
-                time.sleep(2)  # 每2秒检查一次
-
-        threading.Thread(target=env_watch_loop, daemon=True).start()
+    def _update_rtss(self, heart_rate):
+        """使用UI内部状态更新RTSS显示"""
+        ui = self.ui
+        self.rtss.update_heart_rate(ui.current, ui.max_hr, ui.min_hr)
+
+    def start_env_watch_thread(self):
+        """启动环境变量监视：优先使用watchdog文件事件，不可用时回退到轮询线程"""
+        if HAS_WATCHDOG:
+            observer = Observer()
+            observer.schedule(
+                EnvFileEventHandler(self.check_env_file),
+                os.path.abspath("."),
+                recursive=False,
+            )
+            observer.daemon = True
+            observer.start()
+            self.env_observer = observer
+            return
+
+        threading.Thread(target=self.env_watch_loop, daemon=True).start()
+
+    def env_watch_loop(self):
+        """环境变量轮询循环（未安装watchdog时使用）"""
+        while True:
+            self.check_env_file()
+            time.sleep(2)  # 每2秒检查一次
+
+    def check_env_file(self):
+        """检查.env文件，如有修改则重新加载配置"""
+        try:
+            if self.config_watcher.check_and_reload_env():
+                print("环境变量已重新加载")
+                self.reload_config()
+        except Exception as e:
+            print(f"环境变量监视线程出错: {e}")
+
+    def reload_config(self):
+        """重新加载配置并应用到UI和RTSS"""
+        new_config = load_config()
+        old_display_mode = self._display_mode
+        self.config = new_config
+        new_display_mode = new_config.get("DISPLAY_MODE", "both")
+        self._display_mode = new_display_mode
+
+        # 检查显示模式是否改变
+        if old_display_mode != new_display_mode:
+            print(f"显示模式已从 {old_display_mode} 更改为 {new_display_mode}")
+
+            # 根据新模式显示或隐藏UI窗口
+            if new_display_mode in _UI_MODES:
+                self.ui.show_window()
+            elif new_display_mode == "rtss":
+                self.ui.hide_window()
+
+        # 更新 UI 配置
+        self.ui.update_config(new_config)
+        # 更新RTSS配置
+        self.rtss.update_config(new_config)
+        # 重新选定心率处理函数
+        self._build_handlers()
 
     def run(self):
         """运行应用程序"""
         if "你的会话ID" in self.config["HYPERATE_URL"]:
             print("请先修改 HYPERATE_URL 为你的真实链接！")
-            import sys
-
             sys.exit(1)
 
         # 显示启动信息
         print("=" * 50)
         print("Hyperate Triple Overlay 启动")
-        display_mode = self.config.get("DISPLAY_MODE", "both")
+        display_mode = self._display_mode
         print(f"显示模式: {display_mode}")
         print(f"RTSS集成: {'已启用' if self.rtss.is_enabled() else '已禁用'}")
         print("=" * 50)
 
         # 根据显示模式决定是否运行UI
-        if display_mode in ["both", "default"]:
-            # 运行 UI
-            self.ui.run()
-        else:
-            # rtss模式：不显示UI窗口，但保持应用运行
-            print("RTSS模式：UI窗口已隐藏，仅RTSS OSD显示")
-            print("按Ctrl+C退出应用")
-
-            # 保持应用运行以处理心率数据
-            try:
-                import time
-
-                while True:
-                    time.sleep(1)
-            except KeyboardInterrupt:
-                print("接收到退出信号")
-
-        # 应用退出时清理RTSS显示
-        if self.rtss.is_enabled():
-            self.rtss.clear_display()
+        try:
+            if display_mode in _UI_MODES:
+                # 运行 UI
+                self.ui.run()
+            else:
+                # rtss模式：不显示UI窗口，但保持应用运行
+                print("RTSS模式：UI窗口已隐藏，仅RTSS OSD显示")
+                print("按Ctrl+C退出应用")
+
+                # 保持应用运行以处理心率数据
+                try:
+                    while True:
+                        time.sleep(1)
+                except KeyboardInterrupt:
+                    print("接收到退出信号")
+        finally:
+            # 应用退出时（包括右键退出触发的SystemExit）写入剩余数据并清理RTSS显示
+            self.stats_analyzer.close()
+            if self.rtss.is_enabled():
+                self.rtss.clear_display()
 
 
 if __name__ == "__main__":
@@ -4,94 +4,152 @@
 功能：自动更新版本号、同步依赖、提交更改、推送并触发GitHub工作流
 """
 
-import argparse
+from __future__ import annotations
+
+import asyncio
+import functools
 import re
-import subprocess
 import sys
-from typing import Optional, Tuple
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, List, NamedTuple, Optional, Tuple
+
+if TYPE_CHECKING:
+    import argparse
+
+# pyproject.toml 中的版本号行（第2组为版本号），按字节匹配以便原地修改文件
+_VERSION_LINE_RE = re.compile(rb'^(version\s*=\s*)"([^"]+)"', re.MULTILINE)
+# uv.lock 中本项目自身的版本号（第2组为版本号）
+_LOCK_PROJECT_VERSION_RE = re.compile(
+    rb'^(name = "hyperate-overlay"\r?\nversion = )"([^"]+)"', re.MULTILINE
+)
+# git diff 中只涉及版本号行的改动
+_DIFF_VERSION_LINE_RE = re.compile(r'^[-+]version\s*=\s*"[^"]+"$')
+# 语义化版本号：主.次.修订[-预发布][+构建]，自动更新和手动输入共用
+_SEMVER_RE = re.compile(
+    r"^([0-9]+)\.([0-9]+)\.([0-9]+)(-[a-zA-Z0-9\.]+)?(\+[a-zA-Z0-9\.]+)?$"
+)
+
+
+def print_lines(*lines: str):
+    """将多行文本合并为一次写入输出，减少终端逐行写入的开销"""
+    sys.stdout.write("\n".join(lines) + "\n")
+
+
+class SemVer(NamedTuple):
+    """语义化版本号"""
+
+    major: int
+    minor: int
+    patch: int
+    pre: str = ""
+    build: str = ""
+
+    def bump(self, kind: str) -> "SemVer":
+        """按更新类型（major/minor/patch）返回新版本号，预发布和构建后缀保持不变"""
+        if kind == "major":
+            return self._replace(major=self.major + 1, minor=0, patch=0)
+        if kind == "minor":
+            return self._replace(minor=self.minor + 1, patch=0)
+        if kind == "patch":
+            return self._replace(patch=self.patch + 1)
+        raise ValueError(f"不支持的版本类型: {kind}")
+
+    def __str__(self) -> str:
+        return f"{self.major}.{self.minor}.{self.patch}{self.pre}{self.build}"
+
+
+def parse_semver(version: str) -> Optional[SemVer]:
+    """解析版本号字符串，格式不正确时返回None"""
+    match = _SEMVER_RE.match(version)
+    if not match:
+        return None
+    major, minor, patch, pre, build = match.groups()
+    return SemVer(int(major), int(minor), int(patch), pre or "", build or "")
 
 
-def run_command(cmd: str, cwd: Optional[str] = None) -> Tuple[bool, str]:
-    """运行命令并返回结果"""
+async def run_command(cmd: List[str], cwd: Optional[str] = None) -> Tuple[bool, str]:
+    """异步运行命令并返回结果（参数列表直接执行，不经过shell，便于与其他步骤并发执行）"""
     try:
-        result = subprocess.run(
-            cmd,
-            shell=True,
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
             cwd=cwd,
-            capture_output=True,
-            text=True,
-            encoding="utf-8",
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
         )
-        return result.returncode == 0, result.stdout.strip()
+        stdout, _ = await proc.communicate()
+        return proc.returncode == 0, stdout.decode("utf-8", errors="replace").strip()
     except Exception as e:
         return False, str(e)
 
 
-def get_current_version() -> Optional[str]:
-    """从pyproject.toml获取当前版本号"""
+def _read_version_line() -> Optional[Tuple[bytes, "re.Match[bytes]"]]:
+    """读取pyproject.toml，返回文件字节内容及版本号行的匹配结果（第2组为版本号）"""
     try:
-        with open("pyproject.toml", "r", encoding="utf-8") as f:
+        with open("pyproject.toml", "rb") as f:
             content = f.read()
-            match = re.search(r'^version\s*=\s*"([^"]+)"', content, re.MULTILINE)
-            return match.group(1) if match else None
     except FileNotFoundError:
         print("❌ 错误：pyproject.toml文件不存在")
         return None
+    match = _VERSION_LINE_RE.search(content)
+    return (content, match) if match else None
+
+
+def _write_version(
+    content: bytes,
+    line_match: "re.Match[bytes]",
+    new_version: str,
+    path: str = "pyproject.toml",
+):
+    """
+    在文件中原地改写版本号（默认pyproject.toml）
+
+    新旧版本号长度相同时只覆盖版本号本身，否则从版本号处开始重写文件剩余部分
+    """
+    new_bytes = new_version.encode("utf-8")
+    start, end = line_match.span(2)
+    with open(path, "r+b") as f:
+        f.seek(start)
+        if len(new_bytes) == end - start:
+            f.write(new_bytes)
+        else:
+            f.write(new_bytes + content[end:])
+            f.truncate()
+
+
+def get_current_version() -> Optional[str]:
+    """从pyproject.toml获取当前版本号"""
+    version_line = _read_version_line()
+    return version_line[1].group(2).decode("utf-8") if version_line else None
 
 
 def update_version(version_type: str) -> Optional[str]:
     """更新版本号"""
-    current_version = get_current_version()
-    if not current_version:
+    version_line = _read_version_line()
+    if not version_line:
         return None
+    content, line_match = version_line
+    current_version = line_match.group(2).decode("utf-8")
 
     print(f"当前版本: {current_version}")
 
     # 解析版本号
-    match = re.match(
-        r"^(\d+)\.(\d+)\.(\d+)(-[a-zA-Z0-9\.]+)?(\+[a-zA-Z0-9\.]+)?$", current_version
-    )
-    if not match:
+    semver = parse_semver(current_version)
+    if semver is None:
         print(f"❌ 错误：版本号格式不正确: {current_version}")
         return None
 
-    major, minor, patch = int(match.group(1)), int(match.group(2)), int(match.group(3))
-    prerelease = match.group(4) or ""
-    build = match.group(5) or ""
-
     # 根据版本类型更新
-    if version_type == "major":
-        major += 1
-        minor = 0
-        patch = 0
-    elif version_type == "minor":
-        minor += 1
-        patch = 0
-    elif version_type == "patch":
-        patch += 1
-    else:
-        print(f"❌ 错误：不支持的版本类型: {version_type}")
+    try:
+        new_version = str(semver.bump(version_type))
+    except ValueError as e:
+        print(f"❌ 错误：{e}")
         return None
 
-    new_version = f"{major}.{minor}.{patch}{prerelease}{build}"
     print(f"新版本: {new_version}")
 
-    # 更新pyproject.toml
+    # 更新pyproject.toml（复用已读取的内容，直接替换版本号）
     try:
-        with open("pyproject.toml", "r", encoding="utf-8") as f:
-            content = f.read()
-
-        # 替换版本号
-        new_content = re.sub(
-            r'^(version\s*=\s*)"([^"]+)"',
-            f'\\1"{new_version}"',
-            content,
-            flags=re.MULTILINE,
-        )
-
-        with open("pyproject.toml", "w", encoding="utf-8") as f:
-            f.write(new_content)
-
+        _write_version(content, line_match, new_version)
         print(f"✅ 已更新pyproject.toml版本为: {new_version}")
         return new_version
     except Exception as e:
@@ -99,10 +157,47 @@ def update_version(version_type: str) -> Optional[str]:
         return None
 
 
-def sync_dependencies() -> bool:
-    """同步依赖（uv sync）"""
+async def _only_version_changed() -> bool:
+    """检查pyproject.toml相对HEAD的改动是否只有版本号行"""
+    success, output = await run_command(
+        ["git", "diff", "--unified=0", "HEAD", "--", "pyproject.toml"]
+    )
+    if not success:
+        return False
+    changed = [
+        line
+        for line in output.splitlines()
+        if line[:1] in ("-", "+") and not line.startswith(("---", "+++"))
+    ]
+    return len(changed) == 2 and all(_DIFF_VERSION_LINE_RE.match(c) for c in changed)
+
+
+def _update_lock_version(new_version: str) -> bool:
+    """直接改写uv.lock中本项目的版本号，成功返回True"""
+    try:
+        with open("uv.lock", "rb") as f:
+            content = f.read()
+        match = _LOCK_PROJECT_VERSION_RE.search(content)
+        if not match:
+            return False
+        _write_version(content, match, new_version, path="uv.lock")
+        return True
+    except OSError:
+        return False
+
+
+async def sync_dependencies(new_version: Optional[str] = None) -> bool:
+    """同步依赖（uv sync）；仅版本号变化时只改写uv.lock中的项目版本"""
+    if (
+        new_version
+        and await _only_version_changed()
+        and _update_lock_version(new_version)
+    ):
+        print("\n✅ 依赖未变化，跳过uv sync（已更新uv.lock中的项目版本）")
+        return True
+
     print("\n🔄 同步依赖...")
-    success, output = run_command("uv sync")
+    success, output = await run_command(["uv", "sync"])
     if success:
         print("✅ 依赖同步完成")
         return True
@@ -111,25 +206,27 @@ def sync_dependencies() -> bool:
         return False
 
 
-def push_changes() -> bool:
+async def push_changes() -> bool:
     """推送更改到远程仓库"""
     print("\n🚀 推送到GitHub...")
-    success, output = run_command("git push origin main")
+    success, output = await run_command(["git", "push", "origin", "main"])
     if success:
-        print("✅ 推送完成")
-        print("📦 GitHub Actions工作流已触发")
-        print("   请查看: https://github.com/CooperZhuang/hyperate-overlay/actions")
+        print_lines(
+            "✅ 推送完成",
+            "📦 GitHub Actions工作流已触发",
+            "   请查看: https://github.com/CooperZhuang/hyperate-overlay/actions",
+        )
         return True
     else:
         print(f"❌ 推送失败: {output}")
         return False
 
 
-def create_tag(version: str) -> bool:
+async def create_tag(version: str) -> bool:
     """创建本地标签（可选）"""
     print(f"\n🏷️  创建标签 v{version}...")
-    success, output = run_command(
-        f'git tag -a "v{version}" -m "Release version {version}"'
+    success, output = await run_command(
+        ["git", "tag", "-a", f"v{version}", "-m", f"Release version {version}"]
     )
     if success:
         print(f"✅ 标签 v{version} 已创建")
@@ -139,56 +236,42 @@ def create_tag(version: str) -> bool:
         return False
 
 
-def get_multiline_input(prompt: str, default: str = "") -> str:
-    """获取多行输入，以空行结束"""
-    print(prompt)
-    print("请输入多行文本（输入空行结束）:")
-    lines = []
-    while True:
-        try:
-            line = input()
-            if line == "":
-                break
-            lines.append(line)
-        except EOFError:
-            break
-    return "\n".join(lines) if lines else default
-
-
 def _get_commit_message(current_version: str, new_version: str):
     """获取提交信息（内部辅助函数）"""
     # 直接输入提交信息
-    print()
     default_msg = f"chore: bump version to {new_version}"
-    print(f"默认提交信息: '{default_msg}'")
 
     # 直接使用编辑器输入
-    print("\n✅ 将使用编辑器输入提交信息")
-    print("   提交时将打开VSCode编辑器，您可以在编辑器中输入多行提交信息")
-    print("   保存并关闭编辑器后，提交将继续执行")
+    print_lines(
+        "",
+        f"默认提交信息: '{default_msg}'",
+        "",
+        "✅ 将使用编辑器输入提交信息",
+        "   提交时将打开VSCode编辑器，您可以在编辑器中输入多行提交信息",
+        "   保存并关闭编辑器后，提交将继续执行",
+    )
     return new_version, None  # 返回 None 表示使用编辑器
 
 
-def interactive_mode():
+async def interactive_mode():
     """交互式发布模式"""
-    print("=" * 60)
-    print("🚀 交互式发布模式")
-    print("=" * 60)
+    print_lines("=" * 60, "🚀 交互式发布模式", "=" * 60)
 
-    # 显示当前版本
+    # 获取当前版本
     current_version = get_current_version()
     if not current_version:
         sys.exit(1)
 
-    print(f"当前版本: {current_version}")
-    print()
-
-    # 选择版本更新类型
-    print("请选择版本更新类型:")
-    print("1) patch (修订号) - bug修复，向后兼容")
-    print("2) minor (次版本号) - 新功能，向后兼容")
-    print("3) major (主版本号) - 不兼容的API修改")
-    print("4) 手动输入版本号")
+    # 显示当前版本并选择版本更新类型
+    print_lines(
+        f"当前版本: {current_version}",
+        "",
+        "请选择版本更新类型:",
+        "1) patch (修订号) - bug修复，向后兼容",
+        "2) minor (次版本号) - 新功能，向后兼容",
+        "3) major (主版本号) - 不兼容的API修改",
+        "4) 手动输入版本号",
+    )
 
     while True:
         choice = input("请输入选择 (1-4): ").strip()
@@ -206,10 +289,7 @@ def interactive_mode():
     elif choice == "4":
         while True:
             manual_version = input("请输入新版本号 (格式: X.Y.Z): ").strip()
-            if re.match(
-                r"^[0-9]+\.[0-9]+\.[0-9]+(-[a-zA-Z0-9\.]+)?(\+[a-zA-Z0-9\.]+)?$",
-                manual_version,
-            ):
+            if parse_semver(manual_version) is not None:
                 # 对于手动输入版本，我们需要特殊处理
                 print(f"新版本: {manual_version}")
                 confirm = (
@@ -218,16 +298,10 @@ def interactive_mode():
                 if confirm == "y":
                     # 直接更新版本号
                     try:
-                        with open("pyproject.toml", "r", encoding="utf-8") as f:
-                            content = f.read()
-                        new_content = re.sub(
-                            r'^(version\s*=\s*)"([^"]+)"',
-                            f'\\1"{manual_version}"',
-                            content,
-                            flags=re.MULTILINE,
-                        )
-                        with open("pyproject.toml", "w", encoding="utf-8") as f:
-                            f.write(new_content)
+                        version_line = _read_version_line()
+                        if not version_line:
+                            sys.exit(1)
+                        _write_version(*version_line, manual_version)
                         print(f"✅ 已更新pyproject.toml版本为: {manual_version}")
                         new_version = manual_version
                         break
@@ -241,12 +315,8 @@ def interactive_mode():
                 print("❌ 版本号格式不正确，请重新输入")
 
         # 手动输入版本号后也需要同步依赖
-        print("\n🔄 同步依赖...")
-        success, output = run_command("uv sync")
-        if not success:
-            print(f"❌ 依赖同步失败: {output}")
+        if not await sync_dependencies(new_version):
             sys.exit(1)
-        print("✅ 依赖同步完成")
 
         # 跳过自动版本更新的部分，直接进入提交信息输入
         return _get_commit_message(current_version, new_version)
@@ -257,71 +327,91 @@ def interactive_mode():
         sys.exit(1)
 
     # 同步依赖
-    print("\n🔄 同步依赖...")
-    success, output = run_command("uv sync")
-    if not success:
-        print(f"❌ 依赖同步失败: {output}")
+    if not await sync_dependencies(new_version):
         sys.exit(1)
-    print("✅ 依赖同步完成")
 
     return _get_commit_message(current_version, new_version)
 
 
-def commit_changes(version: str, commit_type: str = "chore") -> bool:
+async def commit_changes(version: str, commit_type: str = "chore") -> bool:
     """提交更改"""
+    return await commit_with_message(f"{commit_type}: bump version to {version}")
+
+
+async def commit_with_message(commit_msg: Optional[str]) -> bool:
+    """使用自定义提交信息提交更改，如果commit_msg为None则使用编辑器"""
     print("\n📝 提交更改...")
 
-    # 添加所有更改的文件
+    # 添加所有更改的文件并提交
     print("添加所有更改的文件...")
-    success, output = run_command("git add .")
+    if commit_msg is None:
+        # 使用编辑器输入提交信息
+        print_lines(
+            "正在打开VSCode编辑器输入提交信息...",
+            "请在编辑器中输入提交信息，保存并关闭编辑器后继续",
+        )
+        commit_cmd = ["git", "commit"]
+    else:
+        # 使用命令行提交信息
+        commit_cmd = ["git", "commit", "-m", commit_msg]
+
+    success, output = await run_command(["git", "add", "."])
     if not success:
         print(f"❌ 添加文件失败: {output}")
         return False
 
-    # 提交
-    commit_msg = f"{commit_type}: bump version to {version}"
-    success, output = run_command(f'git commit -m "{commit_msg}"')
-    if success:
-        print(f"✅ 提交完成: {commit_msg}")
-        return True
-    else:
+    success, output = await run_command(commit_cmd)
+    if not success:
         print(f"❌ 提交失败: {output}")
         return False
 
+    if commit_msg is None:
+        print("✅ 提交完成（使用编辑器输入）")
+    else:
+        print(f"✅ 提交完成: {commit_msg}")
+    return True
 
-def commit_with_message(commit_msg: Optional[str]) -> bool:
-    """使用自定义提交信息提交更改，如果commit_msg为None则使用编辑器"""
-    print("\n📝 提交更改...")
 
-    # 添加所有更改的文件
-    print("添加所有更改的文件...")
-    success, output = run_command("git add .")
-    if not success:
-        print(f"❌ 添加文件失败: {output}")
-        return False
+# 命令行快速路径允许的版本类型和开关参数
+_VERSION_TYPES = ("patch", "minor", "major")
+_FAST_FLAGS = {
+    "--no-sync": "no_sync",
+    "--no-push": "no_push",
+    "--create-tag": "create_tag",
+}
 
-    # 提交
-    if commit_msg is None:
-        # 使用编辑器输入提交信息
-        print("正在打开VSCode编辑器输入提交信息...")
-        print("请在编辑器中输入提交信息，保存并关闭编辑器后继续")
-        success, output = run_command("git commit")
-    else:
-        # 使用命令行提交信息
-        success, output = run_command(f'git commit -m "{commit_msg}"')
 
-    if success:
-        if commit_msg is None:
-            print("✅ 提交完成（使用编辑器输入）")
-        else:
-            print(f"✅ 提交完成: {commit_msg}")
-        return True
-    else:
-        print(f"❌ 提交失败: {output}")
-        return False
+def _parse_fast(argv: List[str]) -> Optional[SimpleNamespace]:
+    """
+    快速解析最常见的调用形式：版本类型加若干开关参数（如 `patch --create-tag`）
+
+    其他形式（帮助、带值参数、交互式等）返回None，交给argparse处理
+    """
+    if not argv or argv[0] not in _VERSION_TYPES:
+        return None
+    args = SimpleNamespace(
+        type=argv[0],
+        commit_type="chore",
+        commit_message=None,
+        no_sync=False,
+        no_push=False,
+        create_tag=False,
+        interactive=False,
+    )
+    for arg in argv[1:]:
+        dest = _FAST_FLAGS.get(arg)
+        if dest is None:
+            return None
+        setattr(args, dest, True)
+    return args
 
 
-def main():
+@functools.lru_cache(maxsize=1)
+def _build_parser():
+    """构建命令行参数解析器（只构建一次）"""
+    # argparse 仅在快速路径无法处理时使用，延迟导入
+    import argparse
+
     parser = argparse.ArgumentParser(description="本地自动发布脚本")
     parser.add_argument(
         "type",
@@ -361,19 +451,25 @@ def main():
         help="进入交互式模式",
     )
 
-    args = parser.parse_args()
+    return parser
 
+
+def main():
+    args = _parse_fast(sys.argv[1:]) or _build_parser().parse_args()
+    asyncio.run(main_async(args))
+
+
+async def main_async(args: argparse.Namespace | SimpleNamespace):
+    """发布流程主体"""
     # 交互式模式
     if args.interactive or not args.type:
-        new_version, commit_msg = interactive_mode()
+        new_version, commit_msg = await interactive_mode()
         # 注意：在交互式模式中，commit_type已包含在commit_msg中
         # 交互式模式中已经执行了uv sync，所以这里跳过
         args.no_sync = True
     else:
         # 命令行模式
-        print("=" * 60)
-        print("🚀 本地自动发布脚本")
-        print("=" * 60)
+        print_lines("=" * 60, "🚀 本地自动发布脚本", "=" * 60)
 
         new_version = update_version(args.type)
         if not new_version:
@@ -387,52 +483,64 @@ def main():
 
     # 2. 同步依赖（除非指定跳过）
     if not args.no_sync:
-        if not sync_dependencies():
+        if not await sync_dependencies(new_version):
             sys.exit(1)
 
     # 3. 提交更改
     if args.interactive or not args.type:
         # 交互式模式使用自定义提交信息
-        if not commit_with_message(commit_msg):
+        if not await commit_with_message(commit_msg):
             sys.exit(1)
     else:
         # 命令行模式使用原有逻辑
-        if not commit_changes(new_version, args.commit_type):
+        if not await commit_changes(new_version, args.commit_type):
             sys.exit(1)
 
     # 4. 创建标签（可选）
-    if args.create_tag or (
+    do_tag = args.create_tag or (
         args.interactive and input("\n创建Git标签? (y/N): ").strip().lower() == "y"
-    ):
-        create_tag(new_version)
+    )
 
     # 5. 推送更改（除非指定跳过）
     push_confirm = True
     if args.interactive and not args.no_push:
         push_confirm = input("\n推送到GitHub? (Y/n): ").strip().lower() != "n"
-
-    if (not args.no_push and push_confirm) and (not args.interactive or push_confirm):
-        if not push_changes():
-            sys.exit(1)
-    elif args.interactive and not push_confirm:
+    do_push = (not args.no_push and push_confirm) and (
+        not args.interactive or push_confirm
+    )
+    if args.interactive and not push_confirm:
         print("⏸️  跳过推送步骤")
 
-    print("\n" + "=" * 60)
-    print("🎉 发布流程完成！")
-    print("=" * 60)
-    print(f"版本: {new_version}")
-    print(f"标签: v{new_version}")
-    if (not args.no_push and push_confirm) and (not args.interactive or push_confirm):
-        print("GitHub Actions工作流已触发")
-        print("请等待工作流完成并创建Release")
+    # 标签只推送分支时不会带上，两者互不依赖，可以并发执行
+    tasks = []
+    if do_tag:
+        tasks.append(create_tag(new_version))
+    if do_push:
+        tasks.append(push_changes())
+    results = await asyncio.gather(*tasks)
+    if do_push and not results[-1]:
+        sys.exit(1)
+
+    lines = [
+        "",
+        "=" * 60,
+        "🎉 发布流程完成！",
+        "=" * 60,
+        f"版本: {new_version}",
+        f"标签: v{new_version}",
+    ]
+    if do_push:
+        lines += ["GitHub Actions工作流已触发", "请等待工作流完成并创建Release"]
     else:
-        print("（本地操作完成，未推送到远程）")
-    print("\n下一步:")
-    print(
-        "1. 查看GitHub Actions: https://github.com/CooperZhuang/hyperate-overlay/actions"
-    )
-    print("2. 查看Releases: https://github.com/CooperZhuang/hyperate-overlay/releases")
-    print("=" * 60)
+        lines.append("（本地操作完成，未推送到远程）")
+    lines += [
+        "",
+        "下一步:",
+        "1. 查看GitHub Actions: https://github.com/CooperZhuang/hyperate-overlay/actions",
+        "2. 查看Releases: https://github.com/CooperZhuang/hyperate-overlay/releases",
+        "=" * 60,
+    ]
+    print_lines(*lines)
 
 
 if __name__ == "__main__":
@@ -6,9 +6,69 @@ RTSS集成模块
 使用Saku RTSS CLI DLL在RTSS OSD中显示心率数据
 """
 
-import ctypes
+import functools
 import os
-from ctypes import POINTER, c_bool, c_char_p, c_float, c_int, c_uint
+import string
+import struct
+import threading
+import time
+
+# EmbedGraph 预分配的图形缓冲区容量（浮点数个数），不足时自动扩容
+GRAPH_BUFFER_CAPACITY = 4096
+
+# 默认的RTSS显示格式，以及格式中可用字段在 (当前, 最高, 最低) 中的位置
+DEFAULT_RTSS_DISPLAY_FORMAT = "BPM {current} ({max}/{min})"
+_FORMAT_FIELDS = {"current": 0, "max": 1, "min": 2}
+
+# 两次OSD写入的最小间隔（秒），与RTSS约30Hz的OSD刷新率一致
+OSD_MIN_INTERVAL = 1 / 30
+
+
+@functools.lru_cache(maxsize=128)
+def _encode(text):
+    """将OSD文本编码为UTF-8，重复出现的文本直接复用缓存的字节串"""
+    return text.encode("utf-8")
+
+
+# 已加载并设置好函数签名的DLL，按绝对路径缓存，多个实例共用同一句柄
+_DLL_CACHE = {}
+
+
+def _configure_dll(dll):
+    """设置DLL导出函数的参数和返回值类型"""
+    from ctypes import POINTER, c_bool, c_char_p, c_float, c_int, c_uint
+
+    dll.displayText.argtypes = [c_char_p]
+    dll.displayText.restype = None
+
+    dll.Refresh.argtypes = []
+    dll.Refresh.restype = c_int
+
+    dll.EmbedGraph.argtypes = [
+        c_uint,
+        POINTER(c_float),
+        c_uint,
+        c_uint,
+        c_int,
+        c_int,
+        c_int,
+        c_float,
+        c_float,
+        c_uint,
+    ]
+    dll.EmbedGraph.restype = c_uint
+
+    dll.GetClientsNum.argtypes = []
+    dll.GetClientsNum.restype = c_uint
+
+    dll.GetSharedMemoryVersion.argtypes = []
+    dll.GetSharedMemoryVersion.restype = c_uint
+
+    dll.UpdateOSD.argtypes = [c_char_p]
+    dll.UpdateOSD.restype = c_bool
+
+    dll.ReleaseOSD.argtypes = []
+    dll.ReleaseOSD.restype = c_int
 
 
 class RTSSIntegration:
@@ -24,6 +84,16 @@ class RTSSIntegration:
         self.config = config
         self.dll_loaded = False
         self.dll = None
+        # DLL加载成功且已启用时为True，加载完成后不再变化，供热路径直接判断
+        self._active = False
+        self._update_osd = None
+        self._graph_buf = None  # DLL加载成功后分配
+        # OSD写入合并：只保留最新一组心率，按最小间隔写入DLL
+        self._osd_lock = threading.Lock()
+        self._pending = None
+        self._last_flush = 0.0
+        self._flush_timer = None
+        self._compile_format()
 
         # 根据DISPLAY_MODE决定是否启用RTSS
         display_mode = self.config.get("DISPLAY_MODE", "both")
@@ -42,49 +112,31 @@ class RTSSIntegration:
             # 获取绝对路径
             dll_abs_path = os.path.abspath(dll_path)
 
-            if not os.path.exists(dll_abs_path):
-                print(f"错误: 找不到DLL文件: {dll_abs_path}")
-                self.enabled = False
-                return
-
-            print(f"加载DLL: {dll_abs_path}")
-            # 加载DLL - 使用绝对路径
-            self.dll = ctypes.CDLL(dll_abs_path)
-
-            # 设置函数参数类型
-            self.dll.displayText.argtypes = [c_char_p]
-            self.dll.displayText.restype = None
-
-            self.dll.Refresh.argtypes = []
-            self.dll.Refresh.restype = c_int
-
-            self.dll.EmbedGraph.argtypes = [
-                c_uint,
-                POINTER(c_float),
-                c_uint,
-                c_uint,
-                c_int,
-                c_int,
-                c_int,
-                c_float,
-                c_float,
-                c_uint,
-            ]
-            self.dll.EmbedGraph.restype = c_uint
-
-            self.dll.GetClientsNum.argtypes = []
-            self.dll.GetClientsNum.restype = c_uint
-
-            self.dll.GetSharedMemoryVersion.argtypes = []
-            self.dll.GetSharedMemoryVersion.restype = c_uint
-
-            self.dll.UpdateOSD.argtypes = [c_char_p]
-            self.dll.UpdateOSD.restype = c_bool
-
-            self.dll.ReleaseOSD.argtypes = []
-            self.dll.ReleaseOSD.restype = c_int
+            dll = _DLL_CACHE.get(dll_abs_path)
+            if dll is None:
+                # 仅在启用RTSS时才导入ctypes，禁用时不产生导入开销
+                import ctypes
+
+                print(f"加载DLL: {dll_abs_path}")
+                # 加载DLL - 使用绝对路径，文件不存在时由CDLL直接抛出OSError
+                try:
+                    dll = ctypes.CDLL(dll_abs_path)
+                except OSError as e:
+                    print(f"错误: 找不到或无法加载DLL文件: {e}")
+                    self.enabled = False
+                    self._active = False
+                    return
+                _configure_dll(dll)
+                _DLL_CACHE[dll_abs_path] = dll
+            self.dll = dll
+            if self._graph_buf is None:
+                from ctypes import c_float
+
+                self._graph_buf = (c_float * GRAPH_BUFFER_CAPACITY)()
 
             self.dll_loaded = True
+            self._update_osd = self.dll.UpdateOSD
+            self._active = True
             print("RTSS DLL加载成功")
 
             # 测试连接
@@ -95,10 +147,58 @@ class RTSSIntegration:
             print(f"加载RTSS DLL失败: {e}")
             self.enabled = False
             self.dll_loaded = False
+            self._active = False
+
+    def update_config(self, config):
+        """更新配置并重新编译显示格式"""
+        self.config = config
+        self._compile_format()
+
+    def _compile_format(self):
+        """
+        预先解析RTSS显示格式，拆分为已编码的字面量片段和字段位置
+
+        含格式说明符或未知字段的格式无法预编译，回退到 str.format
+        """
+        display_format = self.config.get(
+            "RTSS_DISPLAY_FORMAT", DEFAULT_RTSS_DISPLAY_FORMAT
+        )
+        self._display_format = display_format
+        self._last_triple = None
+        self._last_bytes = None
+
+        segments = []
+        try:
+            for literal, field, spec, conversion in string.Formatter().parse(
+                display_format
+            ):
+                if literal:
+                    segments.append(literal.encode("utf-8"))
+                if field is None:
+                    continue
+                if spec or conversion or field not in _FORMAT_FIELDS:
+                    segments = None
+                    break
+                segments.append(_FORMAT_FIELDS[field])
+        except ValueError:
+            segments = None
+        self._format_segments = segments
+
+    def _render(self, triple):
+        """按预编译的格式生成OSD文本的UTF-8字节串"""
+        segments = self._format_segments
+        if segments is None:
+            current, max_hr, min_hr = triple
+            text = self._display_format.format(current=current, max=max_hr, min=min_hr)
+            return _encode(text)
+        return b"".join(
+            segment if type(segment) is bytes else _encode(str(triple[segment]))
+            for segment in segments
+        )
 
     def is_enabled(self):
         """检查RTSS集成是否启用"""
-        return self.enabled and self.dll_loaded
+        return self._active
 
     def update_heart_rate(self, current, max_hr, min_hr):
         """
@@ -109,31 +209,61 @@ class RTSSIntegration:
             max_hr: 最高心率
             min_hr: 最低心率
         """
-        if not self.is_enabled():
+        if not self._active:
             return
 
-        try:
-            # 使用配置中的显示格式
-            display_format = self.config.get(
-                "RTSS_DISPLAY_FORMAT", "BPM {current} ({max}/{min})"
-            )
+        with self._osd_lock:
+            self._pending = (current, max_hr, min_hr)
+            wait = self._last_flush + OSD_MIN_INTERVAL - time.monotonic()
+            if wait > 0:
+                # 距上次写入过近，由定时器在下个时间点写入最新值
+                if self._flush_timer is None:
+                    self._flush_timer = threading.Timer(wait, self._flush)
+                    self._flush_timer.daemon = True
+                    self._flush_timer.start()
+                return
+
+        self._flush()
 
-            # 替换变量
-            text = display_format.format(current=current, max=max_hr, min=min_hr)
+    def _flush(self):
+        """将最新一组待写入的心率写入RTSS OSD"""
+        with self._osd_lock:
+            triple = self._pending
+            self._pending = None
+            self._flush_timer = None
+            if triple is None:
+                return
+            self._last_flush = time.monotonic()
 
-            # 更新OSD
-            success = self.update_osd(text)
-            if not success:
-                print("RTSS OSD更新失败")
+            try:
+                self._write_osd(triple)
+            except Exception as e:
+                print(f"更新RTSS显示失败: {e}")
 
-        except Exception as e:
-            print(f"更新RTSS显示失败: {e}")
+    def _write_osd(self, triple):
+        """格式化并写入OSD文本"""
+        # 心率未变化时复用上次编码好的文本
+        if triple != self._last_triple:
+            self._last_bytes = self._render(triple)
+            self._last_triple = triple
+
+        # 更新OSD
+        success = self._update_osd(self._last_bytes)  # pyright: ignore[reportOptionalCall]
+        if not success:
+            print("RTSS OSD更新失败")
 
     def clear_display(self):
         """清除RTSS OSD显示"""
-        if not self.is_enabled():
+        if not self._active:
             return
 
+        # 丢弃尚未写入的心率，避免清除后又被定时器写回
+        with self._osd_lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            self._pending = None
+
         try:
             self.release_osd()
             print("RTSS OSD显示已清除")
@@ -144,19 +274,19 @@ class RTSSIntegration:
 
     def change_osd_text(self, text):
         """更改OSD文本"""
-        if not self.is_enabled():
+        if not self._active:
             return
-        self.dll.displayText(text.encode("utf-8"))  # pyright: ignore[reportOptionalMemberAccess]
+        self.dll.displayText(_encode(text))  # pyright: ignore[reportOptionalMemberAccess]
 
     def reset_osd_text(self):
         """重置OSD文本"""
-        if not self.is_enabled():
+        if not self._active:
             return
         self.dll.ReleaseOSD()  # pyright: ignore[reportOptionalMemberAccess]
 
     def refresh(self):
         """刷新RTSS显示"""
-        if not self.is_enabled():
+        if not self._active:
             return -1
         return self.dll.Refresh()  # pyright: ignore[reportOptionalMemberAccess]
 
@@ -174,14 +304,30 @@ class RTSSIntegration:
         dw_flags,
     ):
         """嵌入图形到RTSS OSD"""
-        if not self.is_enabled():
+        if not self._active:
             return 0
 
-        float_array_type = c_float * len(buffer)
-        lp_buffer = float_array_type(*buffer)
+        # 复用预分配的缓冲区，避免每次调用重新创建ctypes数组类型
+        count = len(buffer)
+        graph_buf = self._graph_buf
+        if count > len(graph_buf):  # pyright: ignore[reportArgumentType]
+            from ctypes import c_float
+
+            graph_buf = self._graph_buf = (c_float * count)()
+
+        try:
+            view = memoryview(buffer)
+        except TypeError:
+            view = None
+        if view is not None and view.format == "f" and view.c_contiguous:
+            # float32 数组（numpy / array.array）直接按字节整块复制
+            memoryview(graph_buf).cast("B")[: view.nbytes] = view.cast("B")
+        else:
+            struct.pack_into(f"{count}f", graph_buf, 0, *buffer)
+
         return self.dll.EmbedGraph(  # pyright: ignore[reportOptionalMemberAccess]
             dw_offset,
-            lp_buffer,
+            graph_buf,
             dw_buffer_pos,
             dw_buffer_size,
             dw_width,
@@ -194,25 +340,25 @@ class RTSSIntegration:
 
     def get_clients_num(self):
         """获取RTSS客户端数量"""
-        if not self.is_enabled():
+        if not self._active:
             return 0
         return self.dll.GetClientsNum()  # pyright: ignore[reportOptionalMemberAccess]
 
     def get_shared_memory_version(self):
         """获取共享内存版本"""
-        if not self.is_enabled():
+        if not self._active:
             return 0
         return self.dll.GetSharedMemoryVersion()  # pyright: ignore[reportOptionalMemberAccess]
 
     def update_osd(self, text):
         """更新OSD显示"""
-        if not self.is_enabled():
+        if not self._active:
             return False
-        return self.dll.UpdateOSD(text.encode("utf-8"))  # pyright: ignore[reportOptionalMemberAccess]
+        return self._update_osd(_encode(text))  # pyright: ignore[reportOptionalCall]
 
     def release_osd(self):
         """释放OSD显示"""
-        if not self.is_enabled():
+        if not self._active:
             return -1
         return self.dll.ReleaseOSD()  # pyright: ignore[reportOptionalMemberAccess]
 
@@ -6,30 +6,112 @@
 计算心率数据的统计信息和分析图表
 """
 
+import atexit
+import bisect
+import csv
+import functools
 import json
+import math
 import os
+import sys
 import threading
 import time
+import weakref
 from collections import deque
+from itertools import islice
+from operator import itemgetter
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from _fast import TREND_WINDOW, hr_summary
+
+# 日志文件写入缓冲区大小，以及默认每写入多少条数据刷新一次
+LOG_BUFFER_SIZE = 64 * 1024
+DEFAULT_FLUSH_EVERY_N = 64
+
+# 待写入数据行的累计大小上限（字符数）和最长停留时间（秒），超出任一即写入文件
+PENDING_MAX_BYTES = 32 * 1024
+PENDING_MAX_AGE = 1.0
+
+# 心率区间边界：极低(<50) / 偏低(50-59) / 正常(60-99) / 偏高(100-139) / 过高(≥140)
+HR_ZONE_EDGES = np.array([50, 60, 100, 140])
+HR_ZONE_KEYS = ("very_low", "low", "normal", "elevated", "high")
+# 增量统计使用的心率直方图大小，超出 [0, HR_HIST_SIZE) 的心率回退到全量计算
+HR_HIST_SIZE = 512
+_HR_HIST_VALUES = np.arange(HR_HIST_SIZE)
+_HR_ZONE_STARTS = np.concatenate(([0], HR_ZONE_EDGES))
+
+# 导出文件的写入缓冲区大小
+EXPORT_BUFFER_SIZE = 1 << 20
+# CSV 导出的列顺序（与数据点字典的键一致）
+EXPORT_FIELDS = ("timestamp", "heart_rate", "datetime")
+
+# Linux <linux/time.h> 中 CLOCK_REALTIME_COARSE 的时钟编号（time 模块未导出该常量）
+LINUX_CLOCK_REALTIME_COARSE = 5
+
+# 数据点时间戳：Linux 上使用粗粒度实时时钟（毫秒级精度，读取开销更低），
+# 其他平台回退到 time.time
+_COARSE_CLOCK = getattr(
+    time,
+    "CLOCK_REALTIME_COARSE",
+    LINUX_CLOCK_REALTIME_COARSE if sys.platform.startswith("linux") else None,
+)
+now = (
+    functools.partial(time.clock_gettime, _COARSE_CLOCK)
+    if _COARSE_CLOCK is not None
+    else time.time
+)
+
+
+def _drain_loop(stats_ref, stop_event):
+    """后台定时写入并刷新待写数据（只持有弱引用，实例被回收或关闭后线程自动退出）"""
+    while not stop_event.wait(PENDING_MAX_AGE):
+        stats = stats_ref()
+        if stats is None:
+            return
+        with stats.data_lock:
+            stats._drain_pending(flush=True)
+        del stats
+
 
-import pandas as pd
+def _close_at_exit(stats_ref):
+    """解释器退出时关闭仍存活的实例"""
+    stats = stats_ref()
+    if stats is not None:
+        stats.close()
 
 
 class HeartRateStats:
     """心率数据统计类"""
 
-    def __init__(self, data_dir: str = "heart_rate_data", max_memory_size: int = 10000):
+    def __init__(
+        self,
+        data_dir: str = "heart_rate_data",
+        max_memory_size: int = 10000,
+        flush_every_n: int = DEFAULT_FLUSH_EVERY_N,
+    ):
         """
         初始化心率统计
 
         Args:
             data_dir: 数据存储目录
             max_memory_size: 内存中最大存储的数据点数量
+            flush_every_n: 每写入多少条数据刷新一次日志文件，1表示每条都刷新
         """
         self.data_dir = data_dir
         self.max_memory_size = max_memory_size
+        self.flush_every_n = max(1, flush_every_n)
+        self._writes_since_flush = 0
+
+        # 待写入日志文件的数据行，批量用 writelines 写入
+        self._pending_lines: List[str] = []
+        self._pending_bytes = 0
+        self._last_drain = time.monotonic()
+
+        # 按秒缓存的时间字符串：(整秒时间戳, ISO格式前缀, 可读时间)
+        self._time_cache: Tuple[int, str, str] = (-1, "", "")
 
         # 创建数据目录
         os.makedirs(self.data_dir, exist_ok=True)
@@ -37,8 +119,14 @@ class HeartRateStats:
         # 内存数据结构 - 使用双端队列以高效移除旧数据
         self.data_queue: deque = deque(maxlen=max_memory_size)
 
+        # 随数据进出队列增量维护的统计量，避免每次重新扫描整个队列
+        self._reset_aggregates()
+
         # 当前日志文件相关
         self.current_date = None
+        # 当前日期的时间戳范围 [起始, 下次切换)，用于快速判断是否跨日
+        self._day_start_ts = 0.0
+        self._next_rollover_ts = 0.0
         self.current_file = None
         self.file_handle = None
 
@@ -48,6 +136,18 @@ class HeartRateStats:
         # 初始化日志文件
         self._init_log_file()
 
+        # 后台每秒写入待写数据并刷新文件缓冲区，保证低频数据也能在约1秒内落盘
+        self._stop_event = threading.Event()
+        threading.Thread(
+            target=_drain_loop,
+            args=(weakref.ref(self), self._stop_event),
+            daemon=True,
+        ).start()
+
+        # 正常退出时刷新并同步缓冲区中的数据（弱引用，不阻止实例被回收）
+        self._atexit_hook = functools.partial(_close_at_exit, weakref.ref(self))
+        atexit.register(self._atexit_hook)
+
         # 获取当前目录下的所有日志文件
         print(f"数据存储目录: {os.path.abspath(self.data_dir)}")
 
@@ -59,6 +159,13 @@ class HeartRateStats:
         """获取指定日期的日志文件名"""
         return os.path.join(self.data_dir, f"heart_rate_{date}.csv")
 
+    def _set_date_bounds(self, date: str):
+        """根据日期字符串计算当天本地时间的起止时间戳"""
+        year, month, day = map(int, date.split("-"))
+        # mktime 会自动规范化 day + 1 的越界（月末、年末）
+        self._day_start_ts = time.mktime((year, month, day, 0, 0, 0, 0, 0, -1))
+        self._next_rollover_ts = time.mktime((year, month, day + 1, 0, 0, 0, 0, 0, -1))
+
     def _init_log_file(self):
         """初始化日志文件"""
         current_date = self._get_current_date()
@@ -70,12 +177,15 @@ class HeartRateStats:
                 self.file_handle = None
 
             self.current_date = current_date
+            self._set_date_bounds(current_date)
             self.current_file = self._get_log_filename(current_date)
 
             # 打开新文件进行追加，写入CSV头部（如果文件不存在）
             try:
                 file_exists = os.path.exists(self.current_file)
-                self.file_handle = open(self.current_file, "a", encoding="utf-8")
+                self.file_handle = open(
+                    self.current_file, "a", encoding="utf-8", buffering=LOG_BUFFER_SIZE
+                )
 
                 # 如果是新文件，写入CSV头部
                 if not file_exists:
@@ -89,11 +199,16 @@ class HeartRateStats:
 
     def _ensure_correct_log_file(self, timestamp: float):
         """确保正在使用正确的日志文件（按日期）"""
-        dt = datetime.fromtimestamp(timestamp)
-        file_date = dt.strftime("%Y-%m-%d")
+        # 绝大多数样本落在当天范围内，无需构造datetime
+        if self._day_start_ts <= timestamp < self._next_rollover_ts:
+            return
+
+        file_date = datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d")
+        self._set_date_bounds(file_date)
 
         if file_date != self.current_date:
-            # 需要切换到新的日期文件
+            # 需要切换到新的日期文件，先将待写数据写入旧文件
+            self._drain_pending()
             if self.file_handle:
                 self.file_handle.close()
                 self.file_handle = None
@@ -102,47 +217,141 @@ class HeartRateStats:
             self.current_file = self._get_log_filename(file_date)
 
             try:
-                self.file_handle = open(self.current_file, "a", encoding="utf-8")
+                self.file_handle = open(
+                    self.current_file, "a", encoding="utf-8", buffering=LOG_BUFFER_SIZE
+                )
                 print(f"切换到新日期日志文件: {self.current_file}")
             except Exception as e:
                 print(f"创建新日期日志文件失败: {e}")
 
     def add_heart_rate(self, heart_rate: int, timestamp: Optional[float] = None):
         """
-        添加心率数据点并立即写入日志文件
+        添加心率数据点并写入日志文件（按 flush_every_n 批量刷新）
 
         Args:
             heart_rate: 心率值 (BPM)
             timestamp: 时间戳，如果未提供则使用当前时间
         """
         if timestamp is None:
-            timestamp = time.time()
+            timestamp = now()
+
+        data_point, data_line = self._format_data_point(heart_rate, timestamp)
+
+        with self.data_lock:
+            # 确保使用正确的日志文件
+            self._ensure_correct_log_file(timestamp)
+
+            self._append_point(data_point)
 
-        # 确保使用正确的日志文件
-        self._ensure_correct_log_file(timestamp)
+            # 写入日志文件缓冲区
+            self._write_lines([data_line])
+
+    def _reset_aggregates(self):
+        """重置增量统计量"""
+        self._hist = np.zeros(HR_HIST_SIZE, dtype=np.int64)
+        self._out_of_range = 0  # 不在直方图范围内的心率个数
+        self._ts_sorted = True  # 队列中的时间戳是否按非递减顺序排列
+
+    def _account(self, heart_rate, delta: int):
+        """将一个心率值计入（delta=1）或移出（delta=-1）增量统计"""
+        if type(heart_rate) is int and 0 <= heart_rate < HR_HIST_SIZE:
+            self._hist[heart_rate] += delta
+        else:
+            self._out_of_range += delta
+
+    def _append_point(self, data_point: Dict):
+        """将数据点加入内存队列并更新增量统计（调用方需持有data_lock）"""
+        queue = self.data_queue
+        if queue:
+            if data_point["timestamp"] < queue[-1]["timestamp"]:
+                self._ts_sorted = False
+            if len(queue) == queue.maxlen:
+                # 队列已满，最旧的数据点即将被挤出
+                self._account(queue[0]["heart_rate"], -1)
+        queue.append(data_point)
+        self._account(data_point["heart_rate"], 1)
+
+    def _format_data_point(self, heart_rate: int, timestamp: float) -> Tuple[Dict, str]:
+        """格式化数据点，返回内存数据点和CSV数据行"""
+        # 与 datetime.fromtimestamp 相同的微秒舍入方式（四舍六入五成双，满一秒进位）
+        frac, whole = math.modf(timestamp)
+        second = int(whole)
+        microsecond = round(frac * 1e6)
+        if microsecond >= 1000000:
+            second += 1
+            microsecond -= 1000000
+
+        # 同一秒内的数据点复用已格式化的日期时间字符串
+        cached_second, iso_prefix, readable_time = self._time_cache
+        if second != cached_second:
+            t = time.localtime(second)
+            date_part = f"{t.tm_year:04d}-{t.tm_mon:02d}-{t.tm_mday:02d}"
+            time_part = f"{t.tm_hour:02d}:{t.tm_min:02d}:{t.tm_sec:02d}"
+            iso_prefix = f"{date_part}T{time_part}"
+            readable_time = (
+                f"{t.tm_year}年{t.tm_mon:02d}月{t.tm_mday:02d}日 {time_part}"
+            )
+            self._time_cache = (second, iso_prefix, readable_time)
 
-        # 格式化数据行 (CSV格式)
-        dt = datetime.fromtimestamp(timestamp)
-        readable_time = dt.strftime("%Y年%m月%d日 %H:%M:%S")
-        data_line = f"{timestamp:.6f},{heart_rate},{dt.isoformat()},{readable_time}"
+        iso_time = f"{iso_prefix}.{microsecond:06d}" if microsecond else iso_prefix
+        # 时间戳列直接由整数秒和微秒拼接，避免逐条的浮点 .6f 格式化
+        data_line = (
+            f"{second}.{microsecond:06d},{heart_rate},{iso_time},{readable_time}\n"
+        )
 
-        # 添加到内存队列
         data_point = {
             "timestamp": timestamp,
             "heart_rate": heart_rate,
-            "datetime": dt.isoformat(),
+            "datetime": iso_time,
         }
+        return data_point, data_line
 
-        with self.data_lock:
-            self.data_queue.append(data_point)
+    def _write_lines(self, lines: List[str]):
+        """
+        将数据行加入待写队列，累计超过大小上限或停留超过最长时间时批量写入
+        （调用方需持有data_lock）
+        """
+        if not lines:
+            return
+        self._pending_lines.extend(lines)
+        self._pending_bytes += sum(map(len, lines))
+        if (
+            self._pending_bytes > PENDING_MAX_BYTES
+            or time.monotonic() - self._last_drain > PENDING_MAX_AGE
+        ):
+            self._drain_pending()
+
+    def _drain_pending(self, flush: bool = False):
+        """
+        将待写数据行一次性写入日志文件（调用方需持有data_lock）
 
-            # 立即写入文件
-            if self.file_handle:
-                try:
-                    self.file_handle.write(data_line + "\n")
-                    self.file_handle.flush()  # 立即刷新到磁盘
-                except Exception as e:
-                    print(f"写入心率数据失败: {e}")
+        Args:
+            flush: 为True时只要有未刷新的数据就刷新文件缓冲区；
+                否则每累计flush_every_n条刷新一次
+        """
+        self._last_drain = time.monotonic()
+        lines = self._pending_lines
+        if lines:
+            self._pending_lines = []
+            self._pending_bytes = 0
+        if not self.file_handle:
+            return
+        try:
+            if lines:
+                self.file_handle.writelines(lines)
+                self._writes_since_flush += len(lines)
+            if self._writes_since_flush and (
+                flush or self._writes_since_flush >= self.flush_every_n
+            ):
+                self.file_handle.flush()
+                self._writes_since_flush = 0
+        except Exception as e:
+            print(f"写入心率数据失败: {e}")
+
+    def flush(self):
+        """将待写数据写入日志文件并刷新"""
+        with self.data_lock:
+            self._drain_pending(flush=True)
 
     def get_recent_data(self, minutes: int = 5) -> List[Dict]:
         """
@@ -157,9 +366,15 @@ class HeartRateStats:
         cutoff_time = time.time() - (minutes * 60)
 
         with self.data_lock:
-            return [
-                point for point in self.data_queue if point["timestamp"] >= cutoff_time
-            ]
+            if self._ts_sorted:
+                # 时间戳有序时二分定位起点，只复制截止时间之后的部分
+                start = bisect.bisect_left(
+                    self.data_queue, cutoff_time, key=itemgetter("timestamp")
+                )
+                return list(islice(self.data_queue, start, None))
+            # 无序时只在锁内复制引用快照，逐点过滤在锁外进行，避免阻塞写入线程
+            snapshot = self.data_queue.copy()
+        return [point for point in snapshot if point["timestamp"] >= cutoff_time]
 
     def get_all_data(self) -> List[Dict]:
         """获取所有数据"""
@@ -179,52 +394,105 @@ class HeartRateStats:
         if not data_points:
             return {}
 
-        heart_rates = [point["heart_rate"] for point in data_points]
-        timestamps = [point["timestamp"] for point in data_points]
+        n = len(data_points)
+        hrs = np.fromiter(
+            (point["heart_rate"] for point in data_points), dtype=np.int32, count=n
+        )
+        timestamps = np.fromiter(
+            (point["timestamp"] for point in data_points), dtype=np.float64, count=n
+        )
 
-        # 基本统计
+        # 最小/最大值、总和、平方和与趋势斜率在一次遍历中得到
+        hr_min, hr_max, total, total_sq, slope = hr_summary(hrs)
+        avg = round(total / n, 1)
+
+        # 基本统计（中位数取排序后下标 n//2 的元素，用 partition 在 O(n) 内完成）
         stats = {
-            "count": len(heart_rates),
-            "min": min(heart_rates),
-            "max": max(heart_rates),
-            "avg": round(sum(heart_rates) / len(heart_rates), 1),
-            "median": sorted(heart_rates)[len(heart_rates) // 2],
+            "count": n,
+            "min": int(hr_min),
+            "max": int(hr_max),
+            "avg": avg,
+            "median": int(np.partition(hrs, n // 2)[n // 2]),
         }
 
-        # 心率变异性（标准差）
-        if len(heart_rates) > 1:
-            mean = stats["avg"]
-            variance = sum((hr - mean) ** 2 for hr in heart_rates) / (
-                len(heart_rates) - 1
-            )
+        # 心率变异性（标准差，沿用以保留一位小数的平均值为中心）
+        if n > 1:
+            # sum((x - avg)^2) = sum(x^2) - 2*avg*sum(x) + n*avg^2
+            squared = float(total_sq) - 2 * avg * float(total) + n * avg * avg
+            variance = max(squared, 0.0) / (n - 1)
             stats["std_dev"] = round(variance**0.5, 2)
         else:
             stats["std_dev"] = 0.0
 
         # 时间范围
-        if timestamps:
-            time_span = max(timestamps) - min(timestamps)
-            stats["duration_seconds"] = time_span
-            stats["duration_minutes"] = round(time_span / 60, 1)
+        time_span = float(np.ptp(timestamps))
+        stats["duration_seconds"] = time_span
+        stats["duration_minutes"] = round(time_span / 60, 1)
 
         # 心率区间统计
-        ranges = {
-            "very_low": len([hr for hr in heart_rates if hr < 50]),
-            "low": len([hr for hr in heart_rates if 50 <= hr < 60]),
-            "normal": len([hr for hr in heart_rates if 60 <= hr < 100]),
-            "elevated": len([hr for hr in heart_rates if 100 <= hr < 140]),
-            "high": len([hr for hr in heart_rates if hr >= 140]),
+        counts = np.bincount(np.digitize(hrs, HR_ZONE_EDGES), minlength=5)
+        stats["ranges"] = dict(zip(HR_ZONE_KEYS, counts.tolist()))
+
+        # 心率变化趋势
+        if n >= TREND_WINDOW:
+            self._set_trend(stats, float(slope))
+
+        return stats
+
+    def _set_trend(self, stats: Dict, slope: float):
+        """写入趋势斜率（最近10个数据点的简单线性回归斜率）及其解释"""
+        stats["trend_slope"] = round(slope, 3)
+        stats["trend"] = self._interpret_trend(slope)
+
+    def _stats_from_aggregates(self) -> Dict:
+        """根据增量维护的心率直方图计算统计信息，结果与 calculate_stats 一致（调用方需持有data_lock）"""
+        queue = self.data_queue
+        n = len(queue)
+        hist = self._hist
+        present = np.flatnonzero(hist)
+        avg = round(float(np.dot(hist, _HR_HIST_VALUES)) / n, 1)
+
+        stats = {
+            "count": n,
+            "min": int(present[0]),
+            "max": int(present[-1]),
+            "avg": avg,
+            # 排序后下标 n//2 的元素：累计个数首次超过 n//2 的心率值
+            "median": int(np.searchsorted(np.cumsum(hist), n // 2, side="right")),
         }
-        stats["ranges"] = ranges
 
-        # 心率变化趋势（最近10个数据点的简单线性回归斜率）
-        if len(heart_rates) >= 10:
-            recent_data = heart_rates[-10:]
-            n = len(recent_data)
-            x = list(range(n))
-            slope = self._calculate_slope(x, recent_data)
-            stats["trend_slope"] = round(slope, 3)
-            stats["trend"] = self._interpret_trend(slope)
+        if n > 1:
+            deviations = _HR_HIST_VALUES - avg
+            variance = float(np.dot(hist, deviations * deviations)) / (n - 1)
+            stats["std_dev"] = round(variance**0.5, 2)
+        else:
+            stats["std_dev"] = 0.0
+
+        if self._ts_sorted:
+            time_span = float(queue[-1]["timestamp"] - queue[0]["timestamp"])
+        else:
+            time_span = float(
+                np.ptp(
+                    np.fromiter(
+                        (point["timestamp"] for point in queue),
+                        dtype=np.float64,
+                        count=n,
+                    )
+                )
+            )
+        stats["duration_seconds"] = time_span
+        stats["duration_minutes"] = round(time_span / 60, 1)
+
+        counts = np.add.reduceat(hist, _HR_ZONE_STARTS)
+        stats["ranges"] = dict(zip(HR_ZONE_KEYS, counts.tolist()))
+
+        if n >= TREND_WINDOW:
+            # 与 calculate_stats 共用 hr_summary 的斜率计算
+            recent = [
+                point["heart_rate"] for point in islice(reversed(queue), TREND_WINDOW)
+            ]
+            slope = hr_summary(np.array(recent[::-1], dtype=np.int32))[4]
+            self._set_trend(stats, float(slope))
 
         return stats
 
@@ -233,19 +501,27 @@ class HeartRateStats:
         return self.calculate_stats(self.get_recent_data(minutes))
 
     def get_overall_stats(self) -> Dict:
-        """获取总体统计信息"""
-        return self.calculate_stats(self.get_all_data())
+        """获取总体统计信息（基于增量维护的统计量，无需扫描全部数据）"""
+        with self.data_lock:
+            if not self.data_queue:
+                return {}
+            if not self._out_of_range:
+                return self._stats_from_aggregates()
+            data = list(self.data_queue)
+        return self.calculate_stats(data)
 
     def clear_data(self):
         """清空所有数据"""
 
-        # 关闭当前文件句柄
-        if self.file_handle:
-            self.file_handle.close()
-            self.file_handle = None
-
         with self.data_lock:
+            # 写入待写数据后关闭当前文件句柄
+            self._drain_pending()
+            if self.file_handle:
+                self.file_handle.close()
+                self.file_handle = None
+
             self.data_queue.clear()
+            self._reset_aggregates()
 
             # 删除所有日志文件
             try:
@@ -273,20 +549,34 @@ class HeartRateStats:
             format: 导出格式 ('csv', 'json', 'txt')
             minutes: 导出最近N分钟的数据，None表示全部数据
         """
+        # 先将待写数据写入日志文件，使导出内容与日志文件一致
+        self.flush()
+
         data = self.get_recent_data(minutes) if minutes else self.get_all_data()
 
         if not data:
             print("没有数据可导出")
             return
 
-        # 转换为DataFrame方便导出
-        df = pd.DataFrame(data)
-
         try:
             if format.lower() == "csv":
-                df.to_csv(filepath, index=False, encoding="utf-8")
+                # 直接用csv模块逐行写出，无需构造DataFrame；行尾沿用系统换行符
+                with open(
+                    filepath,
+                    "w",
+                    newline="",
+                    encoding="utf-8",
+                    buffering=EXPORT_BUFFER_SIZE,
+                ) as f:
+                    writer = csv.DictWriter(
+                        f, fieldnames=EXPORT_FIELDS, lineterminator=os.linesep
+                    )
+                    writer.writeheader()
+                    writer.writerows(data)
             elif format.lower() == "json":
-                with open(filepath, "w", encoding="utf-8") as f:
+                with open(
+                    filepath, "w", encoding="utf-8", buffering=EXPORT_BUFFER_SIZE
+                ) as f:
                     json.dump(data, f, indent=2, ensure_ascii=False)
             elif format.lower() == "txt":
                 with open(filepath, "w", encoding="utf-8") as f:
@@ -302,20 +592,6 @@ class HeartRateStats:
         except Exception as e:
             print(f"导出数据失败: {e}")
 
-    def _calculate_slope(self, x: List[int], y: List[int]) -> float:
-        """计算线性回归斜率"""
-        n = len(x)
-        sum_x = sum(x)
-        sum_y = sum(y)
-        sum_xy = sum(xi * yi for xi, yi in zip(x, y))
-        sum_x2 = sum(xi**2 for xi in x)
-
-        denominator = n * sum_x2 - sum_x**2
-        if denominator == 0:
-            return 0
-
-        return (n * sum_xy - sum_x * sum_y) / denominator
-
     def _interpret_trend(self, slope: float) -> str:
         """解释趋势斜率"""
         if slope > 0.5:
@@ -329,14 +605,31 @@ class HeartRateStats:
         else:
             return "稳定"
 
-    def __del__(self):
-        """析构函数，确保文件句柄被正确关闭"""
-        if self.file_handle:
+    def close(self):
+        """写入待写数据、同步到磁盘并关闭日志文件"""
+        self._stop_event.set()
+        atexit.unregister(self._atexit_hook)
+        with self.data_lock:
+            self._drain_pending()
+            file_handle = self.file_handle
+            self.file_handle = None
+        if not file_handle:
+            return
+        try:
+            file_handle.flush()
+            os.fsync(file_handle.fileno())
+        except Exception:
+            pass
+        finally:
             try:
-                self.file_handle.close()
+                file_handle.close()
             except Exception:
                 pass
 
+    def __del__(self):
+        """析构函数，确保缓冲数据写入磁盘且文件句柄被正确关闭"""
+        self.close()
+
 
 def format_stats_display(stats: Dict) -> str:
     """
@@ -8,9 +8,9 @@ UI 模块
 
 import os
 import sys
-import threading
 import time
 import tkinter as tk
+from collections import deque
 from queue import Queue
 from tkinter import font as tkfont
 
@@ -30,8 +30,13 @@ class HeartRateUI:
         self.max_hr = "--"
         self.min_hr = "--"
         self.blinking = False
-        self.heart_rate_history = []  # 存储心率历史用于计算最高/最低
-        self.max_history_size = 100  # 最大历史记录数
+        # 显示内容是否需要重绘（由后台线程置位，主线程定时重绘时清除）
+        self._dirty = False
+        self.max_history_size = 100  # 计算最高/最低心率的滑动窗口大小
+        # 滑动窗口最高/最低值的单调队列，元素为 (心率, 样本序号)
+        self._max_dq = deque()
+        self._min_dq = deque()
+        self._sample_index = 0
 
         # 线程间通信队列
         self.update_queue = Queue()
@@ -167,9 +172,9 @@ class HeartRateUI:
         # 右键退出
         self.root.bind("<Button-3>", lambda e: sys.exit(0))
 
-        # 闪烁线程
+        # 闪烁检查（在Tk事件循环中定时执行，无需后台线程）
         if self.config["BLINK_ENABLE"]:
-            threading.Thread(target=self.blink_loop, daemon=True).start()
+            self.root.after(500, self._check_blink)
 
     def start_move(self, event):
         self._drag_x = event.x
@@ -245,15 +250,27 @@ class HeartRateUI:
             # 更新当前心率
             self.current = str(hr_int)
 
-            # 添加到历史记录
-            self.heart_rate_history.append(hr_int)
-            if len(self.heart_rate_history) > self.max_history_size:
-                self.heart_rate_history.pop(0)
+            # 计算最高和最低心率：维护单调队列，均摊 O(1)
+            index = self._sample_index
+            self._sample_index += 1
+            window_start = index - self.max_history_size + 1
 
-            # 计算最高和最低心率
-            if self.heart_rate_history:
-                self.max_hr = str(max(self.heart_rate_history))
-                self.min_hr = str(min(self.heart_rate_history))
+            max_dq = self._max_dq
+            while max_dq and max_dq[-1][0] <= hr_int:
+                max_dq.pop()
+            max_dq.append((hr_int, index))
+            while max_dq[0][1] < window_start:
+                max_dq.popleft()
+
+            min_dq = self._min_dq
+            while min_dq and min_dq[-1][0] >= hr_int:
+                min_dq.pop()
+            min_dq.append((hr_int, index))
+            while min_dq[0][1] < window_start:
+                min_dq.popleft()
+
+            self.max_hr = str(max_dq[0][0])
+            self.min_hr = str(min_dq[0][0])
 
             # 打印日志（如果值有变化）
             if (
@@ -266,16 +283,19 @@ class HeartRateUI:
                     f"[{timestamp}] 当前: {self.current} BPM, 最高: {self.max_hr} BPM, 最低: {self.min_hr} BPM"
                 )
 
-            # 更新显示（如果需要）- 使用线程安全的方式
+            # 更新显示（如果需要）- 只标记为待重绘，由主线程的定时循环统一更新，
+            # 后台线程不直接调用Tk
             if update_display:
-                # 使用after在主线程中更新UI
-                self.root.after(0, self._update_display)
+                self._dirty = True
 
         except ValueError:
             pass  # 忽略非数字值
 
     def _update_display(self):
-        """在主线程中更新显示内容"""
+        """在主线程中更新显示内容（仅在有新数据时重绘）"""
+        if not self._dirty:
+            return
+        self._dirty = False
         try:
             self.label_current.configure(text=self.current)
             self.label_max.configure(text=self.max_hr)
@@ -283,33 +303,31 @@ class HeartRateUI:
         except Exception as e:
             print(f"更新显示时出错: {e}")
 
-    def blink_loop(self):
-        while True:
-            if (
-                self.current.isdigit()
-                and int(self.current) > self.config["BLINK_THRESHOLD"]
-                and not self.blinking
-            ):
-                self.blinking = True
-                threading.Thread(target=self.blink_effect, daemon=True).start()
-            time.sleep(0.5)
-
-    def blink_effect(self):
-        while (
+    def _over_blink_threshold(self):
+        """当前心率是否超过闪烁阈值"""
+        return (
             self.current.isdigit()
             and int(self.current) > self.config["BLINK_THRESHOLD"]
-        ):
-            # 使用after在主线程中更新颜色
-            self.root.after(0, lambda: self.label_current.configure(fg="white"))
-            time.sleep(0.15)
-            self.root.after(
-                0, lambda: self.label_current.configure(fg=self.config["CURRENT_COLOR"])
-            )
-            time.sleep(0.15)
-        self.root.after(
-            0, lambda: self.label_current.configure(fg=self.config["CURRENT_COLOR"])
         )
-        self.blinking = False
+
+    def _check_blink(self):
+        """每0.5秒检查一次是否需要开始闪烁"""
+        if not self.blinking and self._over_blink_threshold():
+            self.blinking = True
+            self._blink_step(0)
+        self.root.after(500, self._check_blink)
+
+    def _blink_step(self, phase):
+        """闪烁的一步：phase 0 显示白色，phase 1 恢复原色，各持续0.15秒"""
+        if phase == 0 and not self._over_blink_threshold():
+            # 心率回落，恢复颜色并结束闪烁
+            self.label_current.configure(fg=self.config["CURRENT_COLOR"])
+            self.blinking = False
+            return
+
+        fg = "white" if phase == 0 else self.config["CURRENT_COLOR"]
+        self.label_current.configure(fg=fg)
+        self.root.after(150, self._blink_step, 1 - phase)
 
     def _process_queue(self):
         """处理线程间通信队列中的请求"""
@@ -379,6 +397,8 @@ class HeartRateUI:
     def _show_window_from_queue(self):
         """从队列处理显示窗口请求"""
         try:
+            # 隐藏期间（rtss模式）只更新了内部状态，显示前标记重绘
+            self._dirty = True
             self.root.deiconify()  # 显示窗口
         except Exception as e:
             print(f"显示UI窗口时出错: {e}")
@@ -392,10 +412,8 @@ class HeartRateUI:
 
     def update_display(self):
         """更新显示内容并处理线程队列"""
-        # 更新显示内容
-        self.label_current.configure(text=self.current)
-        self.label_max.configure(text=self.max_hr)
-        self.label_min.configure(text=self.min_hr)
+        # 更新显示内容（无新数据时跳过）
+        self._update_display()
 
         # 处理线程队列中的请求
         self._process_queue()
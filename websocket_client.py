@@ -15,6 +15,30 @@ import time
 import requests
 import websockets
 
+# 可选依赖：orjson 解析/序列化小消息更快，未安装时回退到标准库 json
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+
+    def _json_dumps(obj):
+        # orjson 返回 bytes；解码为 str 以保持文本帧（Phoenix 需要文本帧）
+        return orjson.dumps(obj).decode()
+
+    HAS_ORJSON = True
+except ImportError:
+    _json_loads = json.loads
+    _json_dumps = json.dumps
+    HAS_ORJSON = False
+
+# 网页中websocketKey的匹配模式（直接在原始字节上匹配，避免整页解码）
+_WSKEY_MARKER = b"websocketKey"
+_WSKEY_RE = re.compile(rb"websocketKey\s*=\s*['\"]([^'\"]+)['\"]")
+
+# 预先序列化的 Phoenix 消息模板，发送时只需填入 ref（加入消息还需填入频道名）
+_JOIN_TEMPLATE = '{"topic":%s,"event":"phx_join","payload":{},"ref":%d}'
+_HEARTBEAT_TEMPLATE = '{"topic":"phoenix","event":"heartbeat","payload":{},"ref":%d}'
+
 
 class WebSocketClient:
     """WebSocket 客户端类"""
@@ -42,16 +66,27 @@ class WebSocketClient:
             if not hyperate_url:
                 raise ValueError("HYPERATE_URL 环境变量未设置")
 
-            response = requests.get(hyperate_url, headers=headers, timeout=10)
-            response.raise_for_status()
-            html = response.text
-
-            # 使用正则表达式提取websocketKey
-            pattern = r"websocketKey\s*=\s*['\"]([^'\"]+)['\"]"
-            match = re.search(pattern, html)
+            # 流式读取网页，找到websocketKey后立即停止下载
+            match = None
+            with requests.get(
+                hyperate_url, headers=headers, timeout=10, stream=True
+            ) as response:
+                response.raise_for_status()
+                buffer = b""
+                for chunk in response.iter_content(chunk_size=8192):
+                    buffer += chunk
+                    match = _WSKEY_RE.search(buffer)
+                    if match:
+                        break
+                    # 只保留可能跨块的部分：最后一次出现的关键字之后，或末尾的残片
+                    pos = buffer.rfind(_WSKEY_MARKER)
+                    if pos >= 0:
+                        buffer = buffer[pos:]
+                    else:
+                        buffer = buffer[-(len(_WSKEY_MARKER) - 1) :]
 
             if match:
-                websocket_key = match.group(1)
+                websocket_key = match.group(1).decode("utf-8", "replace")
                 print(f"成功获取websocketKey: {websocket_key[:30]}...")
                 return websocket_key
             else:
@@ -63,9 +98,7 @@ class WebSocketClient:
 
     def start(self):
         """启动 WebSocket 连接线程"""
-        from config import extract_channel_id
-
-        self.channel_id = extract_channel_id(self.config["HYPERATE_URL"])
+        self.channel_id = self.config["CHANNEL_ID"]
         print(f"连接到WebSocket，Channel ID: {self.channel_id}")
 
         # 启动 WebSocket 线程
@@ -88,8 +121,8 @@ class WebSocketClient:
 
     async def websocket_handler(self):
         """处理WebSocket连接"""
-        # 动态获取websocketKey
-        self.websocket_key = self.fetch_websocket_key()
+        # 动态获取websocketKey（阻塞的HTTP请求放到线程池执行，不阻塞事件循环）
+        self.websocket_key = await asyncio.to_thread(self.fetch_websocket_key)
         websocket_url = (
             f"wss://app.hyperate.io/socket/websocket?token={self.websocket_key}"
         )
@@ -103,14 +136,9 @@ class WebSocketClient:
             print("WebSocket连接成功")
 
             # 加入频道
-            join_message = {
-                "topic": f"hr:{self.channel_id}",
-                "event": "phx_join",
-                "payload": {},
-                "ref": self.message_ref,
-            }
+            topic = _json_dumps(f"hr:{self.channel_id}")
+            await websocket.send(_JOIN_TEMPLATE % (topic, self.message_ref))
             self.message_ref += 1
-            await websocket.send(json.dumps(join_message))
             print(f"已加入频道: hr:{self.channel_id}")
 
             # 创建心跳任务
@@ -119,13 +147,19 @@ class WebSocketClient:
             # 接收消息
             try:
                 async for message in websocket:
+                    # 快速预过滤：不含 "hr" 键的消息（phx_reply、心跳应答等）无需解析
+                    if isinstance(message, (bytes, bytearray)):
+                        if b'"hr"' not in message:
+                            continue
+                    elif '"hr"' not in message:
+                        continue
                     try:
-                        data = json.loads(message)
+                        data = _json_loads(message)
                         if "payload" in data and "hr" in data["payload"]:
                             heart_rate = data["payload"]["hr"]
                             self.update_callback(heart_rate)
                     except json.JSONDecodeError:
-                        pass  # 忽略非JSON消息
+                        pass  # 忽略非JSON消息（orjson.JSONDecodeError 为其子类）
                     except Exception as e:
                         print(f"处理消息错误: {e}")
             finally:
@@ -141,14 +175,8 @@ class WebSocketClient:
         """发送心跳消息"""
         while self.ws_connected:
             try:
-                heartbeat_message = {
-                    "topic": "phoenix",
-                    "event": "heartbeat",
-                    "payload": {},
-                    "ref": self.message_ref,
-                }
+                await websocket.send(_HEARTBEAT_TEMPLATE % self.message_ref)
                 self.message_ref += 1
-                await websocket.send(json.dumps(heartbeat_message))
                 await asyncio.sleep(30)  # 每30秒发送一次心跳
             except Exception as e:
                 print(f"发送心跳失败: {e}")